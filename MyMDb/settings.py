@@ -27,13 +27,16 @@ INSTALLED_APPS = [
     'reviews.apps.ReviewsConfig',
 ]
 
+# Session, CSRF, auth and message middleware are skipped under /api/
 MIDDLEWARE = [
+    'api.middleware.async_read_middleware',
+    'api.middleware.replica_middleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'api.middleware.CsrfViewMiddleware',
+    'api.middleware.AuthenticationMiddleware',
+    'api.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -61,11 +64,71 @@ WSGI_APPLICATION = 'MyMDb.wsgi.application'
 # Database
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'ENGINE': config('DB_ENGINE', default='django.db.backends.sqlite3'),
+        'NAME': config('DB_NAME', default=os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': config('DB_USER', default=''),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default=''),
+        'PORT': config('DB_PORT', default=''),
+        # Seconds a connection is reused across requests; 0 closes it
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=False,
+                                     cast=bool),
     }
 }
 
+# Opt-in pragmas applied to every new SQLite connection, see reviews/sqlite.py
+SQLITE_TUNING = config('SQLITE_TUNING', default=False, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    # Negative sizes are in KiB
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-65536, cast=int),
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=268435456, cast=int),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+    'temp_store': 'memory',
+}
+
+# Read replica serving the GET endpoints of the API, see api/db_routers.py
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_REPLICA_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': DB_REPLICA_NAME,
+        'HOST': config('DB_REPLICA_HOST',
+                       default=DATABASES['default']['HOST']),
+        'PORT': config('DB_REPLICA_PORT',
+                       default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
+# Upper bound of the replication lag; cached responses and ETags of data
+# changed more recently are built from the primary
+DB_REPLICA_LAG_SECONDS = config('DB_REPLICA_LAG_SECONDS', default=10,
+                                cast=int)
+
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': config('CACHE_LOCATION', default='mymdb'),
+    }
+}
+
+# Seconds an author's token version is cached; changes made outside the
+# API, e.g. in the admin, take effect within this time
+TOKEN_VERSION_CACHE_TIMEOUT = config('TOKEN_VERSION_CACHE_TIMEOUT',
+                                     default=60, cast=int)
+
+# Read-through cache of title, review and comment responses
+API_CACHE_ENABLED = config('API_CACHE_ENABLED', default=True, cast=bool)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=300, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,13 +168,32 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES':
         'rest_framework.permissions.IsAuthenticated',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ),
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5
 }
 
+# Largest page a client may request from the review and comment feeds
+FEED_MAX_PAGE_SIZE = config('FEED_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Largest number of suggestions returned by the title autocomplete endpoint
+AUTOCOMPLETE_MAX_RESULTS = config('AUTOCOMPLETE_MAX_RESULTS', default=20,
+                                  cast=int)
+
+# Largest number of titles accepted by one bulk create request
+TITLES_BULK_MAX_ITEMS = config('TITLES_BULK_MAX_ITEMS', default=10000,
+                               cast=int)
+
+# Largest number of ids accepted by one review or comment bulk delete
+MODERATION_BULK_MAX_ITEMS = config('MODERATION_BULK_MAX_ITEMS', default=10000,
+                                   cast=int)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=14),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
@@ -128,4 +210,18 @@ EMAIL_USE_TLS = config('EMAIL_USE_TLS')
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Background delivery of outgoing email, see api/mail.py
+EMAIL_QUEUE_BACKEND = config('EMAIL_QUEUE_BACKEND',
+                             default='api.mail.ThreadPoolEmailQueue')
+EMAIL_QUEUE_WORKERS = config('EMAIL_QUEUE_WORKERS', default=2, cast=int)
+EMAIL_QUEUE_BATCH_SIZE = config('EMAIL_QUEUE_BATCH_SIZE', default=100,
+                                cast=int)
+# Seconds before the first retry; doubled after every further failure
+EMAIL_QUEUE_RETRY_DELAY = config('EMAIL_QUEUE_RETRY_DELAY', default=30,
+                                 cast=int)
+EMAIL_QUEUE_MAX_ATTEMPTS = config('EMAIL_QUEUE_MAX_ATTEMPTS', default=6,
+                                  cast=int)
+# Seconds a drain may hold claimed messages before others retry them
+EMAIL_QUEUE_LEASE = config('EMAIL_QUEUE_LEASE', default=300, cast=int)
+
 FILTERS_DEFAULT_LOOKUP_EXPR = 'icontains'
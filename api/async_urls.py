@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.urls import include, path, re_path
+
+from .async_views import (CategoryListView, CommentListView, GenreListView,
+                          ReviewListView, TitleDetailView, TitleListView)
+
+urlpatterns = [
+    re_path(r'^api/v1/titles/$', TitleListView.as_view()),
+    re_path(r'^api/v1/titles/(?P<pk>\d+)/$', TitleDetailView.as_view()),
+    re_path(r'^api/v1/titles/(?P<title_id>\d+)/reviews/$',
+            ReviewListView.as_view()),
+    re_path(r'^api/v1/titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)'
+            r'/comments/$', CommentListView.as_view()),
+    re_path(r'^api/v1/categories/$', CategoryListView.as_view()),
+    re_path(r'^api/v1/genres/$', GenreListView.as_view()),
+    path('', include(settings.ROOT_URLCONF)),
+]
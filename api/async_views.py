@@ -0,0 +1,293 @@
+"""
+Async handlers for anonymous JSON reads of the public API.
+
+They are only routed under ASGI (see `api.middleware`) and produce the same
+bodies, validators and cache entries as the DRF viewsets. Validators and
+cached responses are answered on the event loop; misses go through the
+async ORM. Anything these handlers do not cover, such as the browsable API
+or cursor pagination, is delegated to the synchronous view.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.filters import SearchFilter
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from reviews.models import Review, Title
+from . import lookups
+from .cache import aget_dependent_versions, response_cache_key, stats
+from .conditional import compute_etag, compute_last_modified
+from .filters import TitleFilter
+from .pagination import (FeedCursorPagination, FeedPageNumberPagination,
+                         FeedPagination)
+from .renderers import FastJSONRenderer
+from .serializers import (CategorySerializer, CommentSerializer,
+                          GenreSerializer, ReviewSerializer, TitleSerializer)
+from .views import CommentViewSet, ReviewViewSet, TitleViewSet
+from .viewsets import ListCreateDestroyViewSet, search_in_memory
+
+renderer = FastJSONRenderer()
+
+
+def render(data, status=200):
+    response = HttpResponse(renderer.render(data), status=status,
+                            content_type=renderer.media_type)
+    response['Vary'] = 'Accept'
+    return response
+
+
+def render_exception(exc):
+    data = exc.detail
+    if not isinstance(data, (list, dict)):
+        data = {'detail': data}
+    return render(data, status=exc.status_code)
+
+
+async def delegate(request):
+    """
+    Serve the request with the synchronous view of the root URLconf.
+    """
+    match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+    return await sync_to_async(match.func)(request, *match.args,
+                                           **match.kwargs)
+
+
+class AsyncReadView(View):
+    """
+    Base async list/detail handler mirroring the DRF read path.
+
+    Subclasses provide `get_version_scopes` and `get_data`; `cached`
+    enables the shared response cache like `CachedResponseMixin`.
+    """
+    http_method_names = ('get', 'head')
+    pagination_class = TitleViewSet.pagination_class
+    cached = False
+    delegated_params = ('format', 'expand', 'fields')
+
+    def should_delegate(self, request):
+        return (not request.GET.keys().isdisjoint(self.delegated_params)
+                or 'text/html' in request.headers.get('Accept', ''))
+
+    def get_version_scopes(self, **kwargs):
+        raise NotImplementedError
+
+    async def get_data(self, request, **kwargs):
+        raise NotImplementedError
+
+    async def get(self, request, **kwargs):
+        if self.should_delegate(request):
+            return await delegate(request)
+        full_path = request.get_full_path()
+        versions = await aget_dependent_versions(
+            self.get_version_scopes(**kwargs)
+        )
+        etag = compute_etag(full_path, 'json', versions)
+        last_modified = compute_last_modified(versions)
+        response = get_conditional_response(request, etag=etag,
+                                            last_modified=last_modified)
+        if response is None:
+            response = await self.get_response(request, full_path, versions,
+                                               kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    async def get_response(self, request, full_path, versions, kwargs):
+        cache_enabled = self.cached and settings.API_CACHE_ENABLED
+        if cache_enabled:
+            key = response_cache_key(full_path, versions)
+            data = await cache.aget(key)
+            stats.record(data is not None)
+            if data is not None:
+                response = render(data)
+                response['X-Cache'] = 'HIT'
+                return response
+        try:
+            data = await self.get_data(request, **kwargs)
+        except exceptions.APIException as exc:
+            response = render_exception(exc)
+        else:
+            response = render(data)
+            if cache_enabled:
+                await cache.aset(key, data, settings.API_CACHE_TIMEOUT)
+        if cache_enabled:
+            response['X-Cache'] = 'MISS'
+        return response
+
+    def get_page_size(self, request):
+        paginator = self.pagination_class
+        param = paginator.page_size_query_param
+        if param and param in request.GET:
+            try:
+                size = int(request.GET[param])
+            except ValueError:
+                size = 0
+            if size > 0:
+                if paginator.max_page_size:
+                    size = min(size, paginator.max_page_size)
+                return size
+        return paginator.page_size
+
+    def iterate(self, queryset):
+        # `aiterator()` does not support prefetch_related() before Django 5.0
+        return queryset
+
+    async def paginate(self, request, objects):
+        """
+        Return one page of `objects` (a queryset or a sequence) as a list
+        together with the `count`, `next` and `previous` values.
+        """
+        page_size = self.get_page_size(request)
+        if isinstance(objects, (list, tuple)):
+            count = len(objects)
+        else:
+            count = await objects.acount()
+        page_count = max(1, -(-count // page_size))
+        page = request.GET.get('page') or 1
+        try:
+            page = page_count if page == 'last' else int(page)
+        except ValueError:
+            page = 0
+        if not 1 <= page <= page_count:
+            raise exceptions.NotFound('Invalid page.')
+        bottom = (page - 1) * page_size
+        window = objects[bottom:bottom + page_size]
+        if isinstance(objects, (list, tuple)):
+            items = list(window)
+        else:
+            items = [obj async for obj in self.iterate(window)]
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if page < page_count:
+            next_url = replace_query_param(url, 'page', page + 1)
+        if page == 2:
+            previous_url = remove_query_param(url, 'page')
+        elif page > 2:
+            previous_url = replace_query_param(url, 'page', page - 1)
+        return items, {'count': count, 'next': next_url,
+                       'previous': previous_url}
+
+    async def paginated_data(self, request, objects, serializer_class,
+                             context=None):
+        items, data = await self.paginate(request, objects)
+        data['results'] = serializer_class(items, many=True,
+                                           context=context or {}).data
+        return data
+
+
+async def lookup_snapshots():
+    return {
+        lookup: await sync_to_async(lookup.snapshot)()
+        for lookup in (lookups.categories, lookups.genres)
+    }
+
+
+class TitleListView(AsyncReadView):
+
+    def get_version_scopes(self, **kwargs):
+        return ('titles', 'categories', 'genres')
+
+    async def get_data(self, request):
+        filterset = TitleFilter(request.GET,
+                                queryset=TitleViewSet.queryset.all())
+        if not filterset.is_valid():
+            raise exceptions.ValidationError(filterset.errors)
+        return await self.paginated_data(
+            request, filterset.qs, TitleSerializer,
+            {'lookup_snapshots': await lookup_snapshots()}
+        )
+
+
+class TitleDetailView(AsyncReadView):
+    cached = True
+
+    def get_version_scopes(self, pk):
+        pk = int(pk)
+        return (f'title:{pk}', f'reviews:{pk}', 'categories', 'genres')
+
+    async def get_data(self, request, pk):
+        try:
+            title = await TitleViewSet.queryset.aget(pk=pk)
+        except Title.DoesNotExist:
+            raise exceptions.NotFound
+        return TitleSerializer(
+            title, context={'lookup_snapshots': await lookup_snapshots()}
+        ).data
+
+
+class FeedView(AsyncReadView):
+    pagination_class = FeedPageNumberPagination
+    cached = True
+
+    def should_delegate(self, request):
+        return (super().should_delegate(request)
+                or request.GET.get(FeedPagination.mode_query_param) == 'cursor'
+                or FeedCursorPagination.cursor_query_param in request.GET)
+
+    def iterate(self, queryset):
+        return queryset.aiterator()
+
+
+class ReviewListView(FeedView):
+
+    def get_version_scopes(self, title_id):
+        title_id = int(title_id)
+        return (f'title:{title_id}', f'reviews:{title_id}', 'authors')
+
+    async def get_data(self, request, title_id):
+        if not await Title.objects.filter(pk=title_id).aexists():
+            raise exceptions.NotFound
+        reviews = ReviewViewSet.queryset.filter(title_id=title_id)
+        return await self.paginated_data(request, reviews, ReviewSerializer)
+
+
+class CommentListView(FeedView):
+
+    def get_version_scopes(self, title_id, review_id):
+        return (f'comments:{int(review_id)}', 'authors')
+
+    async def get_data(self, request, title_id, review_id):
+        if not await Review.objects.filter(pk=review_id,
+                                           title__pk=title_id).aexists():
+            raise exceptions.NotFound
+        comments = CommentViewSet.queryset.filter(review_id=review_id)
+        return await self.paginated_data(request, comments,
+                                         CommentSerializer)
+
+
+class LookupListView(AsyncReadView):
+    lookup = None
+    scope = None
+    serializer_class = None
+
+    def get_version_scopes(self, **kwargs):
+        return (self.scope,)
+
+    async def get_data(self, request):
+        snapshot = await sync_to_async(self.lookup.snapshot)()
+        terms = request.GET.get(SearchFilter.search_param, '')
+        terms = terms.replace('\x00', '').replace(',', ' ').split()
+        objects = search_in_memory(snapshot.objects, terms,
+                                   ListCreateDestroyViewSet.search_fields)
+        return await self.paginated_data(request, objects,
+                                         self.serializer_class)
+
+
+class CategoryListView(LookupListView):
+    lookup = lookups.categories
+    scope = 'categories'
+    serializer_class = CategorySerializer
+
+
+class GenreListView(LookupListView):
+    lookup = lookups.genres
+    scope = 'genres'
+    serializer_class = GenreSerializer
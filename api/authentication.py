@@ -0,0 +1,111 @@
+"""
+JWT authentication that answers permission checks from token claims.
+
+Tokens issued by `AuthorAccessToken` carry the author's role and privilege
+flags together with their `token_version`. `ClaimsJWTAuthentication` turns
+such a token into an `Author` instance loaded from the claims alone: the
+remaining fields are deferred and only fetched if a view reads them. The
+token is rejected once the author's `token_version` moves on, which is
+checked against the cache instead of the database. Tokens without the
+claims are authenticated the regular way.
+
+`Author.save` and `Author.revoke_tokens` move `token_version` whenever a
+claimed field or `is_active` changes, wherever the change is made, and
+`publish_token_versions` writes the new version to the cache once the
+transaction commits. Every worker must therefore share the cache (see
+`CACHE_BACKEND`); with a per-process cache other workers keep accepting
+revoked tokens. Cached versions expire after `TOKEN_VERSION_CACHE_TIMEOUT`
+seconds, which bounds how long a version moved by a raw UPDATE that
+bypasses both goes unnoticed.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Author
+from .db_routers import primary_reads
+
+TOKEN_VERSION_KEY = 'api:token-version:{}'
+TOKEN_VERSION_CLAIM = 'ver'
+# Cached for inactive and deleted authors, whose tokens are all rejected
+REVOKED = -1
+# Author fields copied into the token, see `Author.TOKEN_CLAIM_FIELDS`
+CLAIM_FIELDS = ('role', 'is_staff', 'is_superuser')
+
+
+class AuthorAccessToken(AccessToken):
+    """
+    Access token carrying the claims needed by the permission classes.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        return token
+
+
+def load_token_versions(pks, using=None):
+    """
+    Return the token versions of the active authors among `pks`.
+    """
+    return dict(Author.objects.using(using).filter(
+        pk__in=pks, is_active=True
+    ).values_list('pk', 'token_version'))
+
+
+def get_token_version(pk):
+    """
+    Return the token version of an active author, or None.
+    """
+    key = TOKEN_VERSION_KEY.format(pk)
+    version = cache.get(key)
+    if version is None:
+        version = load_token_versions((pk,)).get(pk)
+        cache.set(key, REVOKED if version is None else version,
+                  settings.TOKEN_VERSION_CACHE_TIMEOUT)
+    return None if version == REVOKED else version
+
+
+def cache_token_version(pk, version):
+    """
+    Publish the token version of author `pk`, None revoking every token,
+    once the current transaction commits.
+    """
+    key = TOKEN_VERSION_KEY.format(pk)
+    value = REVOKED if version is None else version
+    transaction.on_commit(lambda: cache.set(
+        key, value, settings.TOKEN_VERSION_CACHE_TIMEOUT
+    ))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` without a user query for `AuthorAccessToken`s.
+    """
+
+    def get_user(self, validated_token):
+        # A lagging replica could miss new users or revive revoked tokens
+        with primary_reads():
+            return self.get_claims_user(validated_token)
+
+    def get_claims_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        pk = validated_token[api_settings.USER_ID_CLAIM]
+        if get_token_version(pk) != validated_token[TOKEN_VERSION_CLAIM]:
+            raise AuthenticationFailed(_("Token has been revoked"),
+                                       code='token_revoked')
+        loaded = {'id': pk, 'is_active': True,
+                  **{field: validated_token[field] for field in CLAIM_FIELDS}}
+        field_names = [field.attname for field in Author._meta.concrete_fields
+                       if field.attname in loaded]
+        return Author.from_db(Author.objects.db, field_names,
+                              [loaded[name] for name in field_names])
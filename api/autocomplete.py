@@ -0,0 +1,131 @@
+import heapq
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+
+from .cache import bump_versions, get_versions
+from .db_routers import primary_reads
+
+SCOPE = 'title-names'
+
+
+def normalize(text):
+    """
+    Fold a title name or prefix into its comparison key.
+    """
+    return unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+
+
+class TitlePrefixIndex:
+    """
+    Process-local sorted-array index of title names for prefix lookups.
+
+    Keys, names, ids and years are kept in parallel arrays ordered by key,
+    so a lookup is one `bisect` plus a slice. Writes are rare, so removal
+    scans the compact id array instead of keeping a reverse mapping.
+
+    The index is built from the database on first use and kept in sync by
+    the `Title` signals; changes committed by other processes are picked up
+    through the `title-names` cache version, which forces a rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self.keys = []
+        self.names = []
+        self.ids = array('q')
+        self.years = array('q')
+
+    @property
+    def is_built(self):
+        return self.version is not None
+
+    def build(self):
+        from reviews.models import Title
+
+        version, = get_versions((SCOPE,))
+        # Loaded from the primary, a replica may lag behind `version`
+        with primary_reads():
+            rows = sorted(
+                (normalize(name), pk, name, year)
+                for pk, name, year in Title.objects.values_list(
+                    'pk', 'name', 'year'
+                ).iterator(chunk_size=10000)
+            )
+        with self._lock:
+            self.keys = [row[0] for row in rows]
+            self.ids = array('q', (row[1] for row in rows))
+            self.names = [row[2] for row in rows]
+            self.years = array('q', (row[3] for row in rows))
+            self.version = version
+
+    def refresh(self):
+        version, = get_versions((SCOPE,))
+        if version != self.version:
+            self.build()
+
+    def _discard(self, pk):
+        try:
+            position = self.ids.index(pk)
+        except ValueError:
+            return
+        for column in (self.keys, self.names, self.ids, self.years):
+            del column[position]
+
+    def _commit(self, change):
+        with self._lock:
+            if not self.is_built:
+                bump_versions(SCOPE)
+                return
+            current, = get_versions((SCOPE,))
+            change()
+            version = bump_versions(SCOPE)
+            self.version = version if current == self.version else None
+
+    def add(self, pk, name, year):
+        def change():
+            self._discard(pk)
+            key = normalize(name)
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.names.insert(position, name)
+            self.ids.insert(position, pk)
+            self.years.insert(position, year)
+        self._commit(change)
+
+    def add_many(self, rows):
+        """
+        Merge `(pk, name, year)` rows of new titles in one pass.
+        """
+        def change():
+            merged = list(heapq.merge(
+                zip(self.keys, self.ids, self.names, self.years),
+                sorted((normalize(name), pk, name, year)
+                       for pk, name, year in rows)
+            ))
+            self.keys = [row[0] for row in merged]
+            self.ids = array('q', (row[1] for row in merged))
+            self.names = [row[2] for row in merged]
+            self.years = array('q', (row[3] for row in merged))
+        self._commit(change)
+
+    def remove(self, pk):
+        self._commit(lambda: self._discard(pk))
+
+    def lookup(self, prefix, limit=10):
+        self.refresh()
+        key = normalize(prefix)
+        with self._lock:
+            start = bisect_left(self.keys, key)
+            stop = bisect_left(self.keys, key + '\U0010ffff', start,
+                               min(start + limit, len(self.keys)))
+            return [
+                {'id': self.ids[i], 'name': self.names[i],
+                 'year': self.years[i]}
+                for i in range(start, stop)
+            ]
+
+
+index = TitlePrefixIndex()
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .db_routers import pin_if_changed
+
+VERSION_KEY = 'api:version:{}'
+RESPONSE_KEY = 'api:response:{}'
+# Bumped after bulk rewrites that skip the model signals; every cached
+# response, validator and lookup snapshot depends on it
+GLOBAL_SCOPE = 'catalog'
+
+
+def get_versions(scopes):
+    """
+    Return the current version token of every scope, creating missing ones.
+    """
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(scopes):
+    """
+    Async `get_versions`.
+    """
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def get_dependent_versions(scopes):
+    """
+    `get_versions` of `scopes` plus the global scope, for entries derived
+    from them.
+
+    The current request stays off a replica that may not have caught up
+    with a recent change, see `api.db_routers`.
+    """
+    versions = get_versions((GLOBAL_SCOPE, *scopes))
+    pin_if_changed(versions)
+    return versions
+
+
+async def aget_dependent_versions(scopes):
+    """
+    Async `get_dependent_versions`.
+    """
+    versions = await aget_versions((GLOBAL_SCOPE, *scopes))
+    pin_if_changed(versions)
+    return versions
+
+
+def bump_versions(*scopes):
+    """
+    Move the given scopes to a new version so dependent entries go stale.
+
+    Returns the new version.
+    """
+    now = time.time_ns()
+    cache.set_many(
+        {VERSION_KEY.format(scope): now for scope in scopes}, timeout=None
+    )
+    return now
+
+
+def response_cache_key(full_path, versions):
+    raw = f'{full_path}|{versions}'
+    return RESPONSE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+class CacheStats:
+    """
+    Process-local hit and miss counters of the response cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+stats = CacheStats()
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache for the actions listed in `cached_actions`.
+
+    Entries are keyed by the request path, the query string and the versions
+    of the scopes returned by `get_version_scopes`, so bumping a scope
+    invalidates every response that depends on it.
+    """
+    cached_actions = ()
+
+    def get_version_scopes(self):
+        raise NotImplementedError
+
+    def get_cache_key(self, request):
+        return response_cache_key(
+            request.get_full_path(),
+            get_dependent_versions(self.get_version_scopes())
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not settings.API_CACHE_ENABLED:
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        stats.record(data is not None)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        if 'list' in self.cached_actions:
+            return self.cached_response(super().list, request, *args,
+                                        **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'retrieve' in self.cached_actions:
+            return self.cached_response(super().retrieve, request, *args,
+                                        **kwargs)
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Cache versions, ETags, cached responses and token revocations are only
+    consistent across workers through a shared cache.
+    """
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'The default cache is local to each process.',
+        hint=('Set CACHE_BACKEND to a shared backend such as Redis or '
+              'Memcached when running more than one worker, otherwise '
+              'workers serve stale responses, ETags and revoked tokens.'),
+        id='api.W001',
+    )]
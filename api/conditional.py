@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import get_dependent_versions
+
+
+class ConditionalResponse(Exception):
+    """
+    Carries the 304 or 412 response answering a conditional request.
+    """
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def compute_etag(full_path, renderer_format, versions):
+    raw = f'{full_path}|{renderer_format}|{versions}'
+    return f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+
+def compute_last_modified(versions):
+    """
+    Return the Last-Modified timestamp of a response, or None while its
+    newest version token is less than a second old.
+
+    HTTP dates have one-second resolution, so a date is only sent once no
+    later change can fall into the same second.
+    """
+    newest = max(versions)
+    if time.time_ns() - newest < 10 ** 9:
+        return None
+    return newest // 10 ** 9
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified support for the actions in `conditional_actions`.
+
+    Both validators are derived from the version tokens of
+    `get_version_scopes`, which are the `time.time_ns()` of the last
+    change, so conditional requests are answered before any query or
+    serialization runs.
+    """
+    conditional_actions = ('list', 'retrieve')
+    etag = None
+    last_modified = None
+
+    def get_validators(self, request):
+        versions = get_dependent_versions(self.get_version_scopes())
+        etag = compute_etag(request.get_full_path(),
+                            request.accepted_renderer.format, versions)
+        return etag, compute_last_modified(versions)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (self.action in self.conditional_actions
+                and request.method in ('GET', 'HEAD')):
+            self.etag, self.last_modified = self.get_validators(request)
+            response = get_conditional_response(
+                request, etag=self.etag, last_modified=self.last_modified
+            )
+            if response is not None:
+                raise ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, ConditionalResponse):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args,
+                                             **kwargs)
+        if self.etag and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            if self.last_modified is not None:
+                response['Last-Modified'] = http_date(self.last_modified)
+        return response
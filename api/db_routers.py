@@ -0,0 +1,84 @@
+"""
+Routing of API reads to the read replica.
+
+`replica_middleware` records the current request while it handles an
+anonymous GET or HEAD request under /api/. Queries made for such a request
+read from the `replica` database, when one is configured. Authenticated
+users always read from the primary so they see their own changes despite
+replication lag, and so does everything else, including all writes.
+
+Cached responses, ETags and the process-local lookup caches are stamped
+with version tokens; they must not be filled from a replica that has not
+caught up with the change that moved a version. The lookup caches always
+load from the primary, and a request that derives its cache key or ETag
+from a version moved within the last `DB_REPLICA_LAG_SECONDS` is read from
+the primary as well.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = 'replica'
+
+current_request = ContextVar('replica_request', default=None)
+
+
+def replica_configured():
+    return REPLICA in connections.settings
+
+
+@contextmanager
+def replica_reads(request):
+    """
+    Let the queries made while handling `request` use the replica.
+    """
+    token = current_request.set(request)
+    try:
+        yield
+    finally:
+        current_request.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from the primary within the block, e.g. for authentication.
+    """
+    token = current_request.set(None)
+    try:
+        yield
+    finally:
+        current_request.reset(token)
+
+
+def pin_if_changed(versions):
+    """
+    Keep the rest of the current request on the primary if any of the
+    version tokens `versions` moved within `DB_REPLICA_LAG_SECONDS`.
+    """
+    request = current_request.get()
+    if request is None or not replica_configured():
+        return
+    horizon = time.time_ns() - settings.DB_REPLICA_LAG_SECONDS * 10 ** 9
+    if max(versions) > horizon:
+        request._replica_stale = True
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        request = current_request.get()
+        if (request is None or not replica_configured()
+                or getattr(request, '_replica_stale', False)):
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
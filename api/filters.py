@@ -0,0 +1,34 @@
+from django_filters import rest_framework as filters
+
+from reviews.models import Title
+
+
+class StableOrderingFilter(filters.OrderingFilter):
+    """
+    Ordering that breaks ties by primary key to keep pages stable.
+    """
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value:
+            qs = qs.order_by(*qs.query.order_by, 'id')
+        return qs
+
+
+class TitleFilter(filters.FilterSet):
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    min_reviews = filters.NumberFilter(field_name='rating_count',
+                                       lookup_expr='gte')
+    # The Meta filters keep the default `icontains` lookup; these exact
+    # variants can use the indexes
+    category__slug__exact = filters.CharFilter(field_name='category__slug',
+                                               lookup_expr='exact')
+    genre__slug__exact = filters.CharFilter(field_name='genre__slug',
+                                            lookup_expr='exact')
+    year__exact = filters.NumberFilter(field_name='year', lookup_expr='exact')
+    ordering = StableOrderingFilter(fields=('rating', 'name', 'year'))
+
+    class Meta:
+        model = Title
+        fields = ('category__slug', 'genre__slug', 'name', 'year')
@@ -0,0 +1,57 @@
+import threading
+
+from reviews.models import Category, Genre
+from .cache import get_dependent_versions
+from .db_routers import primary_reads
+
+
+class LookupSnapshot:
+    """
+    Immutable view of a lookup table at one version.
+    """
+
+    def __init__(self, objects):
+        self.objects = tuple(objects)
+        self.by_pk = {obj.pk: obj for obj in self.objects}
+        self.by_slug = {obj.slug: obj for obj in self.objects}
+
+
+class SlugLookup:
+    """
+    Process-local cache of a small slug-keyed table.
+
+    The rows are reloaded whenever the cache version of `scope` moves, which
+    the model signals do on every write, or the global one does after a bulk
+    load, so all processes sharing the Django
+    cache see a change on their next lookup. Callers should take one
+    `snapshot()` per response and read from it.
+    """
+
+    def __init__(self, model, scope):
+        self.model = model
+        self.scope = scope
+        self._lock = threading.Lock()
+        self._version = None
+        self._snapshot = None
+
+    def __deepcopy__(self, memo):
+        # Serializer fields are deep-copied per instance; the lookup is
+        # shared process-wide.
+        return self
+
+    def snapshot(self):
+        version = tuple(get_dependent_versions((self.scope,)))
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    # Never stamp replica rows with the new version
+                    with primary_reads():
+                        self._snapshot = LookupSnapshot(
+                            self.model.objects.order_by('pk')
+                        )
+                    self._version = version
+        return self._snapshot
+
+
+categories = SlugLookup(Category, 'categories')
+genres = SlugLookup(Genre, 'genres')
@@ -0,0 +1,223 @@
+"""
+Background delivery of outgoing email.
+
+Messages are written to the `OutgoingEmail` outbox inside the caller's
+transaction, so nothing is lost if the process dies before they are sent.
+`EMAIL_QUEUE_BACKEND` selects what happens after the commit:
+
+* `ThreadPoolEmailQueue` (default) drains the outbox on an in-process
+  worker pool, so the request returns without waiting for SMTP;
+* `ImmediateEmailQueue` drains it in the calling thread;
+* `OutboxEmailQueue` leaves it to the `send_queued_email` command.
+
+A drain claims the due rows, sends them over a single connection and
+reschedules failures with exponential backoff until
+`EMAIL_QUEUE_MAX_ATTEMPTS` is reached. The body of a sent row is cleared.
+"""
+import threading
+from concurrent import futures
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from reviews.models import OutgoingEmail
+
+
+def retry_delay(attempts):
+    """
+    Seconds to wait before the next attempt after `attempts` failures.
+    """
+    return settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def claim_due(batch_size):
+    """
+    Return up to `batch_size` due outbox rows, leased to the caller by
+    moving their `next_attempt` past the lease so that concurrent drains
+    skip them.
+    """
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE)
+    due = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING,
+                                       next_attempt__lte=now)
+    pks = list(due.order_by('next_attempt', 'pk').values_list(
+        'pk', flat=True
+    )[:batch_size])
+    if not pks:
+        return []
+    due.filter(pk__in=pks).update(next_attempt=lease)
+    return list(OutgoingEmail.objects.filter(
+        pk__in=pks, status=OutgoingEmail.PENDING, next_attempt=lease
+    ).order_by('pk'))
+
+
+def send_batch(emails):
+    """
+    Send `emails` over one connection and record the outcome of each.
+    """
+    errors = {}
+    try:
+        with get_connection(fail_silently=False) as mail_connection:
+            for email in emails:
+                message = EmailMessage(email.subject, email.body,
+                                       email.from_email, email.recipients,
+                                       connection=mail_connection)
+                try:
+                    message.send()
+                except Exception as exc:
+                    errors[email.pk] = exc
+    except Exception as exc:
+        errors.update((email.pk, exc) for email in emails
+                      if email.pk not in errors)
+    now = timezone.now()
+    # Bodies carry confirmation codes; nothing needs them once sent
+    OutgoingEmail.objects.filter(
+        pk__in=[email.pk for email in emails if email.pk not in errors]
+    ).update(status=OutgoingEmail.SENT, sent=now, last_error='', body='',
+             attempts=F('attempts') + 1)
+    for email in emails:
+        if email.pk not in errors:
+            continue
+        attempts = email.attempts + 1
+        failed = attempts >= settings.EMAIL_QUEUE_MAX_ATTEMPTS
+        OutgoingEmail.objects.filter(pk=email.pk).update(
+            attempts=attempts,
+            last_error=repr(errors[email.pk]),
+            status=OutgoingEmail.FAILED if failed else OutgoingEmail.PENDING,
+            next_attempt=now + timedelta(seconds=retry_delay(attempts)),
+        )
+    return len(emails) - len(errors)
+
+
+def deliver_due(batch_size=None):
+    """
+    Send every due outbox row in batches and return the number sent.
+    """
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    sent = 0
+    while True:
+        emails = claim_due(batch_size)
+        if emails:
+            sent += send_batch(emails)
+        if len(emails) < batch_size:
+            return sent
+
+
+def next_retry():
+    """
+    Return when the earliest pending outbox row becomes due, if any.
+    """
+    return OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING
+    ).aggregate(next_attempt=Min('next_attempt'))['next_attempt']
+
+
+class OutboxEmailQueue:
+    """
+    Store messages in the outbox; delivery is left to `send_queued_email`.
+    """
+
+    def enqueue(self, subject, body, from_email, recipients):
+        email = OutgoingEmail.objects.create(subject=subject, body=body,
+                                             from_email=from_email,
+                                             recipients=list(recipients))
+        transaction.on_commit(self.notify)
+        return email
+
+    def notify(self):
+        pass
+
+    def join(self, timeout=None):
+        pass
+
+
+class ImmediateEmailQueue(OutboxEmailQueue):
+    """
+    Drain the outbox in the calling thread once the transaction commits.
+    """
+
+    def notify(self):
+        deliver_due()
+
+
+class ThreadPoolEmailQueue(OutboxEmailQueue):
+    """
+    Drain the outbox on an in-process worker pool.
+
+    Every commit that enqueues a message schedules a drain; while rows are
+    waiting for a retry a timer schedules one when the earliest becomes due.
+    """
+
+    def __init__(self):
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=settings.EMAIL_QUEUE_WORKERS,
+            thread_name_prefix='email-queue',
+        )
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._timer = None
+        self._timer_due = None
+
+    def notify(self):
+        future = self._executor.submit(self._drain)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def join(self, timeout=None):
+        """
+        Wait for the drains scheduled so far; retry timers are not waited.
+        """
+        with self._lock:
+            pending = set(self._pending)
+        futures.wait(pending, timeout=timeout)
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def _drain(self):
+        try:
+            deliver_due()
+            self._schedule_retry(next_retry())
+        finally:
+            connection.close()
+
+    def _schedule_retry(self, due):
+        if due is None:
+            return
+        with self._lock:
+            if self._timer_due is not None and self._timer_due <= due:
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            delay = (due - timezone.now()).total_seconds()
+            self._timer = threading.Timer(max(delay, 0), self._fire)
+            self._timer.daemon = True
+            self._timer_due = due
+            self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            self._timer = self._timer_due = None
+        self.notify()
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue():
+    """
+    Return the process-wide instance of the configured email queue.
+    """
+    path = settings.EMAIL_QUEUE_BACKEND
+    with _queues_lock:
+        if path not in _queues:
+            _queues[path] = import_string(path)()
+        return _queues[path]
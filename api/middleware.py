@@ -0,0 +1,119 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.middleware import csrf
+from django.utils.decorators import sync_and_async_middleware
+
+from .db_routers import replica_reads
+
+ASYNC_URLCONF = 'api.async_urls'
+API_PATH_PREFIX = '/api/'
+
+
+def is_api_request(request):
+    return request.path_info.startswith(API_PATH_PREFIX)
+
+
+def is_anonymous_read(request):
+    return (request.method in ('GET', 'HEAD')
+            and 'Authorization' not in request.headers)
+
+
+@sync_and_async_middleware
+def async_read_middleware(get_response):
+    """
+    Route anonymous reads to the async handlers when served over ASGI.
+
+    Under WSGI the middleware chain is synchronous and requests pass
+    through untouched.
+    """
+    if not iscoroutinefunction(get_response):
+        return get_response
+
+    async def middleware(request):
+        if is_anonymous_read(request):
+            request.urlconf = ASYNC_URLCONF
+        return await get_response(request)
+
+    return middleware
+
+
+def is_replica_read(request):
+    return is_api_request(request) and is_anonymous_read(request)
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    """
+    Send anonymous API reads to the read replica, see `api.db_routers`.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if is_replica_read(request):
+                with replica_reads(request):
+                    return await get_response(request)
+            return await get_response(request)
+
+        return middleware
+
+    def middleware(request):
+        if is_replica_read(request):
+            with replica_reads(request):
+                return get_response(request)
+        return get_response(request)
+
+    return middleware
+
+
+class SiteOnlyMixin:
+    """
+    Let API requests bypass a `MiddlewareMixin` middleware.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SiteOnlyViewMixin(SiteOnlyMixin):
+    """
+    `SiteOnlyMixin` for middleware with a `process_view` hook, which the
+    handler calls directly; under ASGI API requests skip its thread hop.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            self.process_view = self.aprocess_view
+
+    def process_view(self, request, *args):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, *args)
+
+    async def aprocess_view(self, request, *args):
+        if is_api_request(request):
+            return None
+        return await sync_to_async(super().process_view)(request, *args)
+
+
+def site_only(middleware_class):
+    """
+    Return a subclass of `middleware_class` that API requests bypass.
+
+    The API authenticates with JWT alone, so sessions, messages, CSRF
+    cookies and `request.user` are only needed by the admin and other site
+    pages.
+    """
+    mixin = (SiteOnlyViewMixin if hasattr(middleware_class, 'process_view')
+             else SiteOnlyMixin)
+    return type(middleware_class.__name__, (mixin, middleware_class),
+                {'__module__': __name__})
+
+
+SessionMiddleware = site_only(sessions.SessionMiddleware)
+CsrfViewMiddleware = site_only(csrf.CsrfViewMiddleware)
+AuthenticationMiddleware = site_only(auth.AuthenticationMiddleware)
+MessageMiddleware = site_only(messages.MessageMiddleware)
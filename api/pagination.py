@@ -0,0 +1,51 @@
+from django.conf import settings
+from rest_framework import pagination
+
+
+class FeedPageNumberPagination(pagination.PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = settings.FEED_MAX_PAGE_SIZE
+
+
+class FeedCursorPagination(pagination.CursorPagination):
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = settings.FEED_MAX_PAGE_SIZE
+
+
+class FeedPagination(pagination.BasePagination):
+    """
+    Page number pagination by default, keyset pagination over
+    (pub_date, id) when a client asks for it with `?pagination=cursor`.
+    """
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.delegate = FeedPageNumberPagination()
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or FeedCursorPagination.cursor_query_param in request.query_params
+        )
+
+    @property
+    def display_page_controls(self):
+        return self.delegate.display_page_controls
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.delegate = FeedCursorPagination()
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.delegate.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.delegate.to_html()
+
+    def get_results(self, data):
+        return self.delegate.get_results(data)
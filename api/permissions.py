@@ -20,6 +20,17 @@ class IsSuperuser(permissions.BasePermission):
         return request.user and request.user.is_superuser
 
 
+class IsModeratorOrAdmin(permissions.BasePermission):
+    """
+    The access right is only for moderators and admins.
+    """
+
+    def has_permission(self, request, view):
+        user = request.user
+        return (user and user.is_authenticated
+                and (user.is_admin or user.is_moderator))
+
+
 class IsOwnerOrModeratorOrAdmin(permissions.BasePermission):
     """
     The access right is only for admins, moderators and owners
@@ -27,5 +38,6 @@ class IsOwnerOrModeratorOrAdmin(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         user = request.user
-        return (user and user.is_authenticated and
-                (user == obj.author or user.is_admin or user.is_moderator))
+        return (user and user.is_authenticated
+                and (user.pk == obj.author_id or user.is_admin
+                     or user.is_moderator))
@@ -1,11 +1,19 @@
-from django.db.models import Avg, F
-
 from rest_framework import serializers
 
 import datetime as dt
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.encoding import smart_str
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 
-from reviews.models import Author, Category, Genre, Title, Review, Comment
+from reviews.models import (Author, Category, Genre, GenreTitle, Title,
+                            TitleStats, Review, Comment)
+from reviews.signals import post_bulk_create
 from reviews.validators import UnicodeUsernameValidator, validate_username
+from .lookups import categories, genres
 
 USERNAME_VALIDATORS = [UnicodeUsernameValidator, validate_username]
 
@@ -51,35 +59,368 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class TitleSerializer(serializers.ModelSerializer):
-    rating = serializers.SerializerMethodField()
-    genre = GenreSerializer(many=True, read_only=True)
-    category = CategorySerializer(many=False, read_only=True)
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    `SlugRelatedField` resolved through a `SlugLookup` instead of a query.
+    """
+
+    def __init__(self, lookup, **kwargs):
+        self.lookup = lookup
+        kwargs.setdefault('slug_field', 'slug')
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', lookup.model.objects.all())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not hasattr(self, '_records'):
+            self._records = self.lookup.snapshot()
+        try:
+            return self._records.by_slug[data]
+        except KeyError:
+            # The row may be newer than the snapshot
+            return super().to_internal_value(data)
+        except TypeError:
+            self.fail('invalid')
+
+    def missing(self, objs):
+        """
+        Return the errors for the rows in `objs` that no longer exist,
+        e.g. deleted since the snapshot they were resolved from was taken.
+        """
+        objs = [obj for obj in objs if obj is not None]
+        existing = set(self.lookup.model.objects.filter(
+            pk__in=[obj.pk for obj in objs]
+        ).values_list('pk', flat=True))
+        return [
+            self.error_messages['does_not_exist'].format(
+                slug_name=self.slug_field, value=smart_str(obj.slug)
+            )
+            for obj in objs if obj.pk not in existing
+        ]
+
+
+def stale_lookup_errors(fields, attrs):
+    """
+    Return the field errors of the `CachedSlugRelatedField` values in
+    `attrs` that point at deleted rows.
+    """
+    errors = {}
+    for name, field in fields.items():
+        relation = getattr(field, 'child_relation', field)
+        if (not isinstance(relation, CachedSlugRelatedField)
+                or field.source not in attrs):
+            continue
+        value = attrs[field.source]
+        missing = relation.missing(value if relation is not field
+                                   else [value])
+        if missing:
+            errors[name] = missing
+    return errors
+
+
+class CachedNestedField(serializers.Field):
+    """
+    Read-only nested representation of lookup rows referenced by id.
+
+    The source is either the id itself or, when `pk_field` is given, a
+    related manager whose items carry the id in that attribute. Snapshots
+    passed in the `lookup_snapshots` context are used as they are, so the
+    field never queries from async code.
+    """
+
+    def __init__(self, lookup, serializer_class, pk_field=None, **kwargs):
+        self.lookup = lookup
+        self.serializer_class = serializer_class
+        self.pk_field = pk_field
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def render(self, pk):
+        if not hasattr(self, '_rendered'):
+            snapshots = self.context.get('lookup_snapshots', {})
+            self._records = (snapshots.get(self.lookup)
+                             or self.lookup.snapshot())
+            self._rendered = {}
+        if pk not in self._rendered:
+            obj = self._records.by_pk.get(pk)
+            self._rendered[pk] = (
+                None if obj is None else self.serializer_class(obj).data
+            )
+        return self._rendered[pk]
+
+    def render_many(self, pks):
+        rows = (self.render(pk) for pk in pks)
+        return [row for row in rows if row is not None]
+
+    def to_representation(self, value):
+        if self.pk_field is None:
+            return self.render(value)
+        return self.render_many(getattr(item, self.pk_field)
+                                for item in value.all())
+
+
+class FieldSelectionMixin:
+    """
+    Narrows the fields to the `expand` and `fields` serializer context, as
+    set by `SparseFieldsMixin`: the `Meta.expandable_fields` are left out
+    unless expanded, and with `fields` only the named or expanded fields
+    are represented.
+
+    `fields` only shapes the output. Reads drop the other fields altogether,
+    so they are not computed; writes validate and save every field and
+    filter the representation.
+    """
+
+    def get_selected_fields(self):
+        selected = self.context.get('fields')
+        if selected is None:
+            return None
+        return selected | self.context.get('expand', frozenset())
+
+    def is_read(self):
+        request = self.context.get('request')
+        return request is None or request.method in SAFE_METHODS
+
+    def get_fields(self):
+        fields = super().get_fields()
+        expand = self.context.get('expand', ())
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expand:
+                del fields[name]
+        selected = self.get_selected_fields()
+        if selected is not None and self.is_read():
+            for name in fields.keys() - selected:
+                del fields[name]
+        return fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        selected = self.get_selected_fields()
+        if selected is None or self.is_read():
+            return data
+        return {name: value for name, value in data.items()
+                if name in selected}
+
+
+class RowSerializerMixin:
+    """
+    Read-only rendering of `values_list()` rows, used by `RowListMixin` to
+    list objects without building model instances.
+
+    Each field reads the column named by its source, or by
+    `Meta.row_columns`, which related fields need since they take the
+    column as their representation. Fields in `Meta.row_relations` are
+    filled per row pk by `get_row_relations`. Serializers with fields that
+    fit neither, like nested serializers, are not rendered from rows.
+    """
+    # Their `to_representation` returns database values unchanged
+    PLAIN_FIELDS = (serializers.IntegerField, serializers.CharField,
+                    serializers.FloatField)
+
+    def compile_row_fields(self):
+        """
+        Return the columns to select and a (name, index, convert) extractor
+        per field, `index` being None for relations; None if the fields
+        cannot be rendered from rows.
+        """
+        row_columns = getattr(self.Meta, 'row_columns', {})
+        row_relations = getattr(self.Meta, 'row_relations', ())
+        columns, extractors = [], []
+        for name, field in self.fields.items():
+            if name in row_relations:
+                extractors.append((name, None, None))
+                continue
+            if name in row_columns:
+                column = row_columns[name]
+                convert = (None if isinstance(field, serializers.RelatedField)
+                           else field.to_representation)
+            elif (isinstance(field, (serializers.BaseSerializer,
+                                     serializers.RelatedField))
+                  or field.source == '*' or '.' in field.source):
+                return None
+            else:
+                column = field.source
+                convert = field.to_representation
+            if type(field) in self.PLAIN_FIELDS:
+                convert = None
+            extractors.append((name, len(columns), convert))
+            columns.append(column)
+        return columns, extractors
+
+    @property
+    def row_fields(self):
+        if not hasattr(self, '_row_fields'):
+            self._row_fields = self.compile_row_fields()
+        return self._row_fields
+
+    def get_row_relations(self, rows):
+        """
+        Return a function of the row pk for every field in
+        `Meta.row_relations` that is rendered.
+        """
+        return {}
+
+    def rows_to_representation(self, rows):
+        """
+        Render named `values_list()` rows that carry a `pk` and the columns
+        from `row_fields`, in that order.
+        """
+        _, extractors = self.row_fields
+        relations = (self.get_row_relations(rows)
+                     if any(index is None for _, index, _ in extractors)
+                     else {})
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert in extractors:
+                if index is None:
+                    item[name] = relations[name](row.pk)
+                    continue
+                value = row[index]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    histogram = serializers.DictField(child=serializers.IntegerField(),
+                                      read_only=True)
+
+    class Meta:
+        model = TitleStats
+        fields = ('histogram', 'review_count', 'comment_count',
+                  'last_activity')
+
+
+class TitleSerializer(FieldSelectionMixin, RowSerializerMixin,
+                      serializers.ModelSerializer):
+    rating = serializers.FloatField(read_only=True)
+    genre = CachedNestedField(genres, GenreSerializer, pk_field='genre_id',
+                              source='genretitle_set')
+    category = CachedNestedField(categories, CategorySerializer,
+                                 source='category_id')
+    stats = TitleStatsSerializer(read_only=True)
 
     class Meta:
         model = Title
         required_fields = ('name', 'year', 'genre', 'category')
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
+        expandable_fields = ('stats',)
+        row_relations = ('genre',)
 
-    @staticmethod
-    def get_rating(obj):
-        result = obj.reviews.aggregate(
-            rating=Avg(F('score'), default=None))
-        return result['rating']
+    def get_row_relations(self, rows):
+        genre_ids = defaultdict(list)
+        links = GenreTitle.objects.filter(
+            title_id__in=[row.pk for row in rows]
+        ).order_by('pk').values_list('title_id', 'genre_id')
+        for title_id, genre_id in links:
+            genre_ids[title_id].append(genre_id)
+        field = self.fields['genre']
+        return {'genre': lambda pk: field.render_many(genre_ids[pk])}
+
+
+class TitleBulkListSerializer(serializers.ListSerializer):
+    """
+    Validates every title on its own and saves the valid ones in bulk.
+
+    Items that fail validation are reported in `item_errors`, keyed by their
+    position in the request body, instead of failing the whole list; so are
+    items whose genre or category was deleted after validation.
+    """
+
+    def check_length(self, data):
+        if not isinstance(data, list):
+            return 'not_a_list', {'input_type': type(data).__name__}
+        if not self.allow_empty and not data:
+            return 'empty', {}
+        if self.max_length is not None and len(data) > self.max_length:
+            return 'max_length', {'max_length': self.max_length}
+        return None, {}
+
+    def to_internal_value(self, data):
+        code, params = self.check_length(data)
+        if code is not None:
+            message = self.error_messages[code].format(**params)
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [message]
+            }, code=code)
+        self.item_indexes = []
+        self.item_errors = {}
+        validated = []
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                self.item_errors[index] = exc.detail
+            else:
+                self.item_indexes.append(index)
+        return validated
+
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        except IntegrityError:
+            stale = {
+                position: errors
+                for position, attrs in enumerate(self.validated_data)
+                if (errors := stale_lookup_errors(self.child.fields, attrs))
+            }
+            if not stale:
+                raise
+        # Report the items resolved from a stale lookup snapshot and save
+        # the rest
+        for position, errors in stale.items():
+            self.item_errors[self.item_indexes[position]] = errors
+        self.item_errors = dict(sorted(self.item_errors.items()))
+        self.item_indexes = [index for position, index
+                             in enumerate(self.item_indexes)
+                             if position not in stale]
+        self._validated_data = [attrs for position, attrs
+                                in enumerate(self.validated_data)
+                                if position not in stale]
+        if not self._validated_data:
+            return []
+        return super().save(**kwargs)
+
+    def create(self, validated_data):
+        genres = [dict.fromkeys(attrs['genre']) for attrs in validated_data]
+        with transaction.atomic():
+            titles = Title.objects.bulk_create(
+                Title(**{key: value for key, value in attrs.items()
+                         if key != 'genre'})
+                for attrs in validated_data
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title=title, genre=genre)
+                for title, title_genres in zip(titles, genres)
+                for genre in title_genres
+            )
+            post_bulk_create.send(sender=Title, instances=titles)
+        return titles
 
 
 class TitleWriteSerializer(serializers.ModelSerializer):
-    rating = serializers.SerializerMethodField()
-    genre = serializers.SlugRelatedField(queryset=Genre.objects.all(),
-                                         many=True,
-                                         slug_field='slug')
-    category = serializers.SlugRelatedField(slug_field='slug',
-                                            queryset=Category.objects.all())
+    rating = serializers.FloatField(read_only=True)
+    genre = CachedSlugRelatedField(genres, many=True)
+    category = CachedSlugRelatedField(categories)
 
     class Meta:
         model = Title
         required_fields = ('name', 'year', 'genre', 'category')
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
+        list_serializer_class = TitleBulkListSerializer
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            errors = stale_lookup_errors(self.fields, self.validated_data)
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
 
     @staticmethod
     def validate_year(year):
@@ -89,14 +430,9 @@ class TitleWriteSerializer(serializers.ModelSerializer):
             )
         return year
 
-    @staticmethod
-    def get_rating(obj):
-        result = obj.reviews.aggregate(
-            rating=Avg(F('score'), default=None))
-        return result['rating']
-
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(FieldSelectionMixin, RowSerializerMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(slug_field='username',
                                           read_only=True)
 
@@ -104,9 +440,11 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         required_fields = ('text', 'score')
         fields = ('id', 'text', 'author', 'score', 'pub_date')
+        row_columns = {'author': 'author__username'}
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(FieldSelectionMixin, RowSerializerMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(slug_field='username',
                                           read_only=True)
 
@@ -114,3 +452,20 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         required_fields = ('text',)
         fields = ('id', 'text', 'author', 'pub_date')
+        row_columns = {'author': 'author__username'}
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.MODERATION_BULK_MAX_ITEMS
+    )
+
+
+class SearchResultSerializer(serializers.Serializer):
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    title_id = serializers.IntegerField()
+    review_id = serializers.IntegerField(allow_null=True)
+    snippet = serializers.CharField()
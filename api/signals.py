@@ -0,0 +1,134 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import (Author, Category, Comment, Genre, GenreTitle,
+                            Review, Title)
+from reviews.signals import (post_bulk_create, post_bulk_delete,
+                             post_bulk_load, post_token_revoke)
+from . import autocomplete
+from .authentication import cache_token_version, load_token_versions
+from .cache import GLOBAL_SCOPE, bump_versions
+
+
+def bump_on_commit(*scopes):
+    transaction.on_commit(partial(bump_versions, *scopes))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    bump_on_commit('titles', f'title:{instance.pk}')
+
+
+@receiver(post_save, sender=Title)
+def index_title_name(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(
+            autocomplete.index.add, instance.pk, instance.name, instance.year
+        ))
+
+
+@receiver(post_bulk_create, sender=Title)
+def index_title_names(sender, instances, **kwargs):
+    bump_on_commit('titles')
+    transaction.on_commit(partial(autocomplete.index.add_many, [
+        (title.pk, title.name, title.year) for title in instances
+    ]))
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title_name(sender, instance, **kwargs):
+    transaction.on_commit(partial(autocomplete.index.remove, instance.pk))
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_genre_title(sender, instance, **kwargs):
+    bump_on_commit('titles', f'title:{instance.title_id}')
+
+
+@receiver(m2m_changed, sender=GenreTitle)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_on_commit('titles', f'title:{instance.pk}')
+    elif pk_set:
+        bump_on_commit('titles', *(f'title:{pk}' for pk in pk_set))
+    else:
+        bump_on_commit('genres')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    bump_on_commit('titles', f'reviews:{instance.title_id}',
+                   f'comments:{instance.pk}')
+
+
+@receiver(post_bulk_delete, sender=Review)
+def invalidate_reviews(sender, rows, **kwargs):
+    bump_on_commit('titles',
+                   *{f'reviews:{title_id}' for _, title_id in rows},
+                   *(f'comments:{pk}' for pk, _ in rows))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    bump_on_commit('title-stats', f'comments:{instance.review_id}')
+
+
+@receiver(post_bulk_delete, sender=Comment)
+def invalidate_comments(sender, rows, **kwargs):
+    bump_on_commit('title-stats',
+                   *{f'comments:{review_id}' for _, review_id in rows})
+
+
+@receiver(post_bulk_load)
+def invalidate_everything(sender, **kwargs):
+    bump_on_commit(GLOBAL_SCOPE, autocomplete.SCOPE)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_categories(sender, instance, **kwargs):
+    bump_on_commit('categories')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genres(sender, instance, **kwargs):
+    bump_on_commit('genres')
+
+
+@receiver(post_delete, sender=Author)
+def revoke_deleted_author_tokens(sender, instance, **kwargs):
+    cache_token_version(instance.pk, None)
+
+
+@receiver(post_token_revoke, sender=Author)
+def publish_token_versions(sender, pks, using, **kwargs):
+    versions = load_token_versions(pks, using)
+    for pk in pks:
+        cache_token_version(pk, versions.get(pk))
+
+
+@receiver(post_save, sender=Author)
+def invalidate_renamed_author(sender, instance, created, update_fields=None,
+                              **kwargs):
+    # Review and comment lists show usernames; a new author has neither
+    if created or (update_fields is not None
+                   and 'username' not in update_fields):
+        return
+    if instance.username_changed():
+        bump_on_commit('authors')
+
+
+@receiver(post_delete, sender=Author)
+def invalidate_authors(sender, instance, **kwargs):
+    bump_on_commit('authors')
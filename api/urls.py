@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework import routers
 from .views import (GetTokenView, AuthorViewSet, SignupView, CategoryViewSet,
-                    GenreViewSet, TitleViewSet, ReviewViewSet, CommentViewSet)
+                    GenreViewSet, TitleViewSet, ReviewViewSet, CommentViewSet,
+                    SearchView)
 
 router = routers.DefaultRouter()
 router.register(r'users', AuthorViewSet)
@@ -18,5 +19,6 @@ app_name = 'api_reviews'
 urlpatterns = [
     path('v1/', include(router.urls)),
     path('v1/auth/signup/', SignupView.as_view()),
-    path('v1/auth/token/', GetTokenView.as_view())
+    path('v1/auth/token/', GetTokenView.as_view()),
+    path('v1/search/', SearchView.as_view()),
 ]
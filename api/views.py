@@ -1,18 +1,23 @@
-from rest_framework import status, viewsets, views
-from rest_framework.generics import get_object_or_404
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework import generics, status, viewsets, views
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import (IsAuthenticated,
                                         AllowAny,
                                         IsAuthenticatedOrReadOnly)
+from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from django.contrib.auth import tokens, login
+from django.conf import settings
+from django.contrib.auth import tokens
+from django.contrib.auth.models import update_last_login
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
 
-from reviews.models import (Author, Category, Genre, Title, ADMIN,
-                            Review, Comment)
+from reviews.models import (Author, Category, Genre, GenreTitle, Title,
+                            ADMIN, Review, Comment)
+from reviews.search import get_backend
 from .utils import send_email
+from .authentication import AuthorAccessToken
 from .serializers import (GetTokenSerializer,
                           AuthorSerializer,
                           SignupSerializer,
@@ -21,9 +26,20 @@ from .serializers import (GetTokenSerializer,
                           TitleSerializer,
                           TitleWriteSerializer,
                           ReviewSerializer,
-                          CommentSerializer)
-from .permissions import IsAdminUser, IsOwnerOrModeratorOrAdmin
-from .viewsets import ListCreateDestroyViewSet
+                          CommentSerializer,
+                          SearchResultSerializer)
+from . import autocomplete, lookups
+from .cache import CachedResponseMixin
+from .conditional import ConditionalGetMixin
+from .filters import TitleFilter
+from .pagination import FeedPagination
+from .permissions import (IsAdminUser, IsModeratorOrAdmin,
+                          IsOwnerOrModeratorOrAdmin)
+from .viewsets import (BulkDeleteMixin, ListCreateDestroyViewSet,
+                       ParentLookupMixin, RowListMixin, SparseFieldsMixin)
+
+GENRE_PREFETCH = Prefetch('genretitle_set',
+                          queryset=GenreTitle.objects.order_by('pk'))
 
 
 class GetTokenView(views.APIView):
@@ -47,8 +63,9 @@ class GetTokenView(views.APIView):
             token=confirmation_code
         )
         if is_token_confirmed:
-            login(request, user)
-            token = AccessToken.for_user(user)
+            # Moving `last_login` invalidates the confirmation code
+            update_last_login(None, user)
+            token = AuthorAccessToken.for_user(user)
             data = {"token": str(token)}
             return Response(data, status=status.HTTP_200_OK)
 
@@ -87,13 +104,19 @@ class AuthorViewSet(viewsets.ModelViewSet):
 
     def get_object(self):
         if self.kwargs.get('username') == 'me':
-            return self.request.user
+            user = self.request.user
+            if user.get_deferred_fields():
+                # Token-backed users only carry the claimed fields
+                user = self.get_queryset().get(pk=user.pk)
+            return user
         return super().get_object()
 
     def get_permissions(self):
         if (self.action in ('retrieve', 'partial_update')
                 and self.kwargs.get('username') == 'me'):
             return (IsAuthenticated(),)
+        if self.action == 'delete_content':
+            return (IsModeratorOrAdmin(),)
         return super().get_permissions()
 
     def partial_update(self, request, *args, **kwargs):
@@ -112,39 +135,142 @@ class AuthorViewSet(viewsets.ModelViewSet):
                             status=status.HTTP_405_METHOD_NOT_ALLOWED)
         return super().destroy(self, request, *args, **kwargs)
 
+    @action(detail=True, methods=('post',))
+    def delete_content(self, request, username=None):
+        author = self.get_object()
+        with transaction.atomic():
+            comments = Comment.objects.filter(author=author).bulk_delete()
+            reviews = Review.objects.filter(author=author).bulk_delete()
+        return Response({'reviews': reviews, 'comments': comments})
 
-class CategoryViewSet(ListCreateDestroyViewSet):
+
+class CategoryViewSet(ConditionalGetMixin, ListCreateDestroyViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cached_lookup = lookups.categories
+
+    @staticmethod
+    def get_version_scopes():
+        return ('categories',)
 
 
-class GenreViewSet(ListCreateDestroyViewSet):
+class GenreViewSet(ConditionalGetMixin, ListCreateDestroyViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cached_lookup = lookups.genres
+
+    @staticmethod
+    def get_version_scopes():
+        return ('genres',)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all()
+class TitleViewSet(ConditionalGetMixin, CachedResponseMixin, RowListMixin,
+                   SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.prefetch_related(GENRE_PREFETCH).order_by('id')
     serializer_class = TitleSerializer
     filter_backends = (DjangoFilterBackend,)
-    filterset_fields = ('category__slug', 'genre__slug', 'name', 'year',)
+    filterset_class = TitleFilter
     permission_classes = (IsAdminUser,)
+    lookup_value_regex = r'\d+'
+    cached_actions = ('retrieve',)
+    expandable = ('stats',)
+    field_columns = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'description': ('description',),
+        'rating': ('rating',),
+        'genre': (),
+        'category': ('category',),
+    }
+    field_prefetches = {'genre': (GENRE_PREFETCH,)}
+
+    def get_version_scopes(self):
+        if self.action == 'list':
+            scopes = ('titles', 'categories', 'genres')
+        else:
+            pk = int(self.kwargs['pk'])
+            scopes = (f'title:{pk}', f'reviews:{pk}', 'categories', 'genres')
+        if 'stats' in self.get_expand():
+            scopes += ('title-stats',)
+        return scopes
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if 'stats' in self.get_expand():
+            queryset = queryset.select_related('stats')
+        return queryset
 
     def get_serializer_class(self):
-        if self.action in ('create', 'partial_update', 'update'):
+        if self.action in ('create', 'partial_update', 'update', 'bulk'):
             return TitleWriteSerializer
         return self.serializer_class
 
     def get_permissions(self):
-        if self.action in ('retrieve', 'list'):
+        if self.action in ('retrieve', 'list', 'autocomplete'):
             return (AllowAny(),)
         return super().get_permissions()
 
+    @action(detail=False)
+    def autocomplete(self, request):
+        prefix = request.query_params.get('prefix', '').strip()
+        if not prefix:
+            raise ValidationError(
+                {'prefix': 'This query parameter is required.'}
+            )
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        limit = max(1, min(limit, settings.AUTOCOMPLETE_MAX_RESULTS))
+        return Response(autocomplete.index.lookup(prefix, limit))
+
+    @action(detail=False, methods=('post',))
+    def bulk(self, request):
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False,
+            max_length=settings.TITLES_BULK_MAX_ITEMS
+        )
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save() if serializer.validated_data else []
+        data = {
+            'created': [
+                {'index': index, 'id': title.pk}
+                for index, title in zip(serializer.item_indexes, titles)
+            ],
+            'errors': [
+                {'index': index, 'errors': errors}
+                for index, errors in serializer.item_errors.items()
+            ],
+        }
+        if titles:
+            return Response(data, status=status.HTTP_201_CREATED)
+        return Response(data, status=status.HTTP_400_BAD_REQUEST)
+
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    queryset = Review.objects.all()
+class ReviewViewSet(ConditionalGetMixin, CachedResponseMixin,
+                    ParentLookupMixin, BulkDeleteMixin, RowListMixin,
+                    SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
+    pagination_class = FeedPagination
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    cached_actions = ('list',)
+    field_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+    }
+    # Read by cursor pagination whatever the representation
+    required_columns = ('pk', 'pub_date')
+
+    def get_version_scopes(self):
+        title_id = int(self.kwargs['title_id'])
+        return (f'title:{title_id}', f'reviews:{title_id}', 'authors')
 
     def get_permissions(self):
         if self.action in ('destroy', 'partial_update'):
@@ -172,18 +298,32 @@ class ReviewViewSet(viewsets.ModelViewSet):
         )
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return self.queryset.filter(title=title)
+        return super().get_queryset().filter(title=self.get_parent())
 
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all()
+class CommentViewSet(ConditionalGetMixin, CachedResponseMixin,
+                     ParentLookupMixin, BulkDeleteMixin, RowListMixin,
+                     SparseFieldsMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializer
+    pagination_class = FeedPagination
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title__pk': 'title_id'}
+    cached_actions = ('list',)
+    field_columns = {
+        'id': ('id',),
+        'text': ('text',),
+        'author': ('author__username',),
+        'pub_date': ('pub_date',),
+    }
+    required_columns = ('pk', 'pub_date')
+
+    def get_version_scopes(self):
+        return (f'comments:{int(self.kwargs["review_id"])}', 'authors')
 
     def get_permissions(self):
         if self.action in ('destroy', 'partial_update'):
@@ -191,17 +331,18 @@ class CommentViewSet(viewsets.ModelViewSet):
         return super().get_permissions()
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__pk=self.kwargs.get('title_id')
-        )
-        return self.queryset.filter(review=review)
+        return super().get_queryset().filter(review=self.get_parent())
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__pk=self.kwargs.get('title_id')
-        )
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+
+class SearchView(generics.ListAPIView):
+    serializer_class = SearchResultSerializer
+    permission_classes = (AllowAny,)
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'This query parameter is required.'})
+        return get_backend().search(query)
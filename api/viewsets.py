@@ -1,7 +1,27 @@
 from rest_framework import viewsets, mixins, filters
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS, AllowAny
+from rest_framework.response import Response
 
-from .permissions import IsAdminUser
+from .permissions import IsAdminUser, IsModeratorOrAdmin
+from .serializers import BulkDeleteSerializer
+
+
+def search_in_memory(objects, terms, search_fields):
+    """
+    `SearchFilter` semantics over loaded objects, with Unicode casefolding.
+    """
+    terms = [term.casefold() for term in terms]
+    return [
+        obj for obj in objects
+        if all(
+            any(term in str(getattr(obj, field)).casefold()
+                for field in search_fields)
+            for term in terms
+        )
+    ]
 
 
 class ListCreateDestroyViewSet(mixins.ListModelMixin,
@@ -12,8 +32,180 @@ class ListCreateDestroyViewSet(mixins.ListModelMixin,
     filter_backends = (filters.SearchFilter,)
     lookup_field = 'slug'
     search_fields = ('name',)
+    cached_lookup = None
 
     def get_permissions(self):
         if self.action == 'list':
             return (AllowAny(),)
         return super().get_permissions()
+
+    def search_cached(self, objects):
+        terms = filters.SearchFilter().get_search_terms(self.request)
+        return search_in_memory(objects, terms, self.search_fields)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Serve the list from `cached_lookup` when one is set, applying the
+        `search` parameter in memory.
+        """
+        if self.cached_lookup is None:
+            return super().list(request, *args, **kwargs)
+        objects = self.search_cached(self.cached_lookup.snapshot().objects)
+        page = self.paginate_queryset(objects)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(objects, many=True)
+        return Response(serializer.data)
+
+
+class ParentLookupMixin:
+    """
+    Resolves the parent object of a nested route once per request.
+    """
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            lookups = {
+                lookup: self.kwargs.get(kwarg)
+                for lookup, kwarg in self.parent_lookups.items()
+            }
+            self._parent = get_object_or_404(self.parent_model, **lookups)
+        return self._parent
+
+
+class BulkDeleteMixin:
+    """
+    Adds a moderator-only `bulk_delete` action that removes the listed
+    objects of the current queryset with set-based queries.
+    """
+
+    def get_permissions(self):
+        if self.action == 'bulk_delete':
+            return (IsModeratorOrAdmin(),)
+        return super().get_permissions()
+
+    @action(detail=False, methods=('post',))
+    def bulk_delete(self, request, *args, **kwargs):
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        deleted = self.get_queryset().filter(
+            pk__in=serializer.validated_data['ids']
+        ).bulk_delete()
+        return Response({'deleted': deleted})
+
+
+def parse_field_names(request, param, allowed):
+    """
+    The names in the comma-separated query parameter `param`, or None when
+    it is absent or blank; names outside `allowed` are a validation error.
+    """
+    value = request.query_params.get(param, '')
+    names = frozenset(name.strip() for name in value.split(',')) - {''}
+    if not names:
+        return None
+    unknown = names.difference(allowed)
+    if unknown:
+        raise ValidationError({param: [
+            f'Unknown field: {name}.' for name in sorted(unknown)
+        ]})
+    return names
+
+
+class ExpandMixin:
+    """
+    Parses the comma-separated `expand` query parameter into the serializer
+    context; only the names listed in `expandable` are accepted.
+    """
+    expand_query_param = 'expand'
+    expandable = ()
+
+    def get_expand(self):
+        if not hasattr(self, '_expand'):
+            self._expand = parse_field_names(
+                self.request, self.expand_query_param, self.expandable
+            ) or frozenset()
+        return self._expand
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['expand'] = self.get_expand()
+        return context
+
+
+class SparseFieldsMixin(ExpandMixin):
+    """
+    Adds the comma-separated `fields` query parameter, which limits the
+    representation to the named fields and, on reads, the query to what they
+    need.
+
+    `field_columns` maps every selectable field to the columns it reads,
+    related ones through `select_related`, and `field_prefetches` to the
+    prefetches it needs. `required_columns` are always loaded.
+    """
+    fields_query_param = 'fields'
+    field_columns = {}
+    field_prefetches = {}
+    required_columns = ('pk',)
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = parse_field_names(
+                self.request, self.fields_query_param,
+                {*self.field_columns, *self.expandable}
+            )
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None or self.request.method not in SAFE_METHODS:
+            return queryset
+        columns = [*self.required_columns, *(
+            column for name in fields
+            for column in self.field_columns.get(name, ())
+        )]
+        related = {column.rsplit('__', 1)[0]
+                   for column in columns if '__' in column}
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns).prefetch_related(*(
+            lookup for name in fields
+            for lookup in self.field_prefetches.get(name, ())
+        ))
+
+
+class RowListMixin:
+    """
+    Serves JSON `list` responses from `values_list()` rows when the
+    serializer can render them (see `RowSerializerMixin`), skipping model
+    instances. `required_columns` are selected along, e.g. for the cursor
+    pagination to read its position from the rows.
+    """
+    required_columns = ('pk',)
+
+    def list(self, request, *args, **kwargs):
+        child = self.get_serializer(many=True).child
+        row_fields = getattr(child, 'row_fields', None)
+        if request.accepted_renderer.format != 'json' or row_fields is None:
+            return super().list(request, *args, **kwargs)
+        columns = row_fields[0]
+        columns = columns + [column for column in self.required_columns
+                             if column not in columns]
+        rows = self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        ).values_list(*columns, named=True)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                child.rows_to_representation(page)
+            )
+        return Response(child.rows_to_representation(rows))
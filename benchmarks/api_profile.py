@@ -0,0 +1,137 @@
+"""
+Per-request latency and database writes of token issuance and API reads with
+the stock Django middleware stack and session login, versus the API profile
+that skips session, CSRF, auth and message middleware under /api/.
+
+    python -m benchmarks.api_profile --repeat 500
+"""
+import time
+
+from benchmarks.common import (argument_parser, report, seed_catalog,
+                               setup_django, test_database)
+
+STOCK_MIDDLEWARE = {
+    'api.middleware.SessionMiddleware':
+        'django.contrib.sessions.middleware.SessionMiddleware',
+    'api.middleware.CsrfViewMiddleware':
+        'django.middleware.csrf.CsrfViewMiddleware',
+    'api.middleware.AuthenticationMiddleware':
+        'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.MessageMiddleware':
+        'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+
+def legacy_urlconf():
+    """
+    URLconf whose token view also logs the author into a session, as
+    `GetTokenView` used to.
+    """
+    from django.contrib.auth import login
+    from django.urls import include, path
+
+    from api.views import GetTokenView
+    from reviews.models import Author
+
+    class SessionTokenView(GetTokenView):
+
+        def post(self, request):
+            response = GetTokenView.post(request)
+            if response.status_code == 200:
+                login(request, Author.objects.get(
+                    username=request.data['username']
+                ))
+            return response
+
+    class LegacyUrls:
+        urlpatterns = [
+            path('api/v1/auth/token/', SessionTokenView.as_view()),
+            path('api/', include('api.urls')),
+        ]
+
+    return LegacyUrls
+
+
+def run(client, method, url, data, repeat):
+    """
+    Return the mean milliseconds and database writes per request; `data`
+    is called before every request to build its payload.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    send = getattr(client, method)
+    send(url, data=data())
+    elapsed = writes = 0
+    for _ in range(repeat):
+        payload = data()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            send(url, data=payload)
+            elapsed += time.perf_counter() - start
+        writes += sum(
+            query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            for query in context.captured_queries
+        )
+    return elapsed * 1000 / repeat, writes / repeat
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(repeat=500)
+    args = parser.parse_args()
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import tokens
+    from django.test import Client, override_settings
+    from rest_framework.test import APIClient
+
+    from api.authentication import AuthorAccessToken
+    from reviews.models import Author
+
+    with test_database():
+        titles = seed_catalog(titles=20, reviews_per_title=10,
+                              comments_per_review=5)
+        author = Author.objects.get(username='bench0')
+
+        def token_data():
+            # Logging in moves `last_login`, which invalidates older codes
+            author.refresh_from_db(fields=('last_login',))
+            return {
+                'username': author.username,
+                'confirmation_code':
+                    tokens.default_token_generator.make_token(author),
+            }
+
+        authorized = APIClient()
+        authorized.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AuthorAccessToken.for_user(author)}'
+        )
+        cases = (
+            ('POST token', Client(), 'post', '/api/v1/auth/token/',
+             token_data),
+            ('GET titles (anonymous)', Client(), 'get', '/api/v1/titles/',
+             dict),
+            ('GET reviews (token)', authorized, 'get',
+             f'/api/v1/titles/{titles[0].pk}/reviews/', dict),
+        )
+        stock = override_settings(
+            MIDDLEWARE=[STOCK_MIDDLEWARE.get(name, name)
+                        for name in settings.MIDDLEWARE],
+            ROOT_URLCONF=legacy_urlconf(),
+            API_CACHE_ENABLED=False,
+        )
+        profile = override_settings(API_CACHE_ENABLED=False)
+        for label, overrides in (('stock', stock), ('api profile', profile)):
+            with overrides:
+                for name, client, method, url, data in cases:
+                    client.cookies.clear()
+                    latency, writes = run(client, method, url, data,
+                                          args.repeat)
+                    report(f'{name} ({label})', latency, 'ms/request')
+                    report(f'{name} ({label}) writes', writes,
+                           'writes/request')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Throughput of the anonymous read endpoints over WSGI and ASGI.
+
+Requests are driven in-process: the WSGI path through Django's test client
+on a thread pool, the ASGI path through the async test client on one event
+loop, both with the given number of requests in flight.
+
+    python -m benchmarks.async_reads --concurrency 1 100 1000 --repeat 2000
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (argument_parser, report, seed_catalog,
+                               setup_django, test_database)
+
+
+def urls_for(titles, reviews):
+    return [
+        '/api/v1/titles/',
+        *(f'/api/v1/titles/{title.pk}/' for title in titles),
+        *(f'/api/v1/titles/{review.title_id}/reviews/' for review in reviews),
+        *(f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/comments/'
+          for review in reviews),
+    ]
+
+
+def run_wsgi(urls, repeat, concurrency):
+    from django.db import connection
+    from django.test import Client
+
+    local = threading.local()
+
+    def fetch(index):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        local.client.get(urls[index % len(urls)])
+
+    def close(_):
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+        list(executor.map(fetch, range(repeat)))
+        elapsed = time.perf_counter() - start
+        list(executor.map(close, range(concurrency)))
+    return repeat / elapsed
+
+
+def run_asgi(urls, repeat, concurrency):
+    from django.test import AsyncClient
+
+    async def worker(client, indexes):
+        for index in indexes:
+            await client.get(urls[index % len(urls)])
+
+    async def main():
+        client = AsyncClient()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            worker(client, range(offset, repeat, concurrency))
+            for offset in range(concurrency)
+        ))
+        return repeat / (time.perf_counter() - start)
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 100, 1000],
+                        help='Numbers of requests in flight.')
+    parser.set_defaults(repeat=2000)
+    args = parser.parse_args()
+    setup_django()
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import override_settings
+
+    from reviews.models import Review
+
+    directory = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, 'bench.sqlite3'
+    )
+    with test_database():
+        titles = seed_catalog(titles=20, reviews_per_title=10,
+                              comments_per_review=5)
+        urls = urls_for(titles, Review.objects.all()[:20])
+        for enabled in (False, True):
+            label = 'cached' if enabled else 'uncached'
+            with override_settings(API_CACHE_ENABLED=enabled):
+                for concurrency in args.concurrency:
+                    for name, run in (('wsgi', run_wsgi),
+                                      ('asgi', run_asgi)):
+                        cache.clear()
+                        rate = run(urls, args.repeat, concurrency)
+                        report(f'{name} x{concurrency} ({label})', rate,
+                               'req/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Build time, memory and lookup latency of the title autocomplete index.
+
+    python -m benchmarks.autocomplete --titles 1000000 --repeat 10000
+"""
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import (argument_parser, measure, report,
+                               setup_django, test_database)
+
+SYLLABLES = ('ма', 'ро', 'ка', 'ли', 'не', 'то', 'вё', 'зу', 'ша', 'пе')
+BATCH_SIZE = 10000
+
+
+def seed_titles(count):
+    from reviews.models import Title
+
+    rng = random.Random(0)
+    for start in range(0, count, BATCH_SIZE):
+        Title.objects.bulk_create(
+            Title(name=' '.join(
+                ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+                for _ in range(rng.randint(1, 3))
+            ).capitalize(), year=rng.randint(1900, 2023))
+            for _ in range(start, min(start + BATCH_SIZE, count))
+        )
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--titles', type=int, default=1000000,
+                        help='Number of synthetic titles to index.')
+    parser.set_defaults(repeat=10000)
+    args = parser.parse_args()
+    setup_django()
+    from django.test import Client
+
+    from api.autocomplete import TitlePrefixIndex
+
+    with test_database():
+        seed_titles(args.titles)
+        index = TitlePrefixIndex()
+        tracemalloc.start()
+        start = time.perf_counter()
+        index.build()
+        report('index build', time.perf_counter() - start, 's')
+        report('index memory', tracemalloc.get_traced_memory()[0] / 2 ** 20,
+               'MiB')
+        tracemalloc.stop()
+        for prefix in ('М', 'маро', 'марокали'):
+            rate = measure(lambda: index.lookup(prefix), args.repeat)
+            report(f'lookup {prefix!r}', 1e6 / rate, 'us')
+        client = Client()
+        url = '/api/v1/titles/autocomplete/'
+        rate = measure(lambda: client.get(url, {'prefix': 'маро'}),
+                       args.repeat // 10)
+        report('autocomplete endpoint', 1000 / rate, 'ms/req')
+        rate = measure(lambda: client.get('/api/v1/titles/',
+                                          {'name': 'маро'}),
+                       max(args.repeat // 1000, 1))
+        report('titles list ?name= (icontains)', 1000 / rate, 'ms/req')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Every benchmark runs against a throwaway test database, so the project
+settings (and the `.env` they read) must be importable.
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MyMDb.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def argument_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--repeat', type=int, default=200,
+                        help='Number of timed iterations per case.')
+    return parser
+
+
+def measure(func, repeat):
+    """
+    Call `func` `repeat` times and return the calls per second.
+    """
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return repeat / (time.perf_counter() - start)
+
+
+def report(name, value, unit):
+    print(f'{name:<50} {value:>14,.1f} {unit}')
+
+
+def seed_catalog(titles=50, reviews_per_title=20, comments_per_review=5,
+                 genres_per_title=3):
+    """
+    Bulk-load a synthetic catalog and return the created titles.
+    """
+    from reviews.models import (Author, Category, Comment, Genre,
+                                GenreTitle, Review, Title)
+
+    authors = Author.objects.bulk_create(
+        Author(username=f'bench{i}', email=f'bench{i}@yamdb.fake')
+        for i in range(max(reviews_per_title, 1))
+    )
+    category = Category.objects.create(name='Фильм', slug='bench-movie')
+    genres = Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'bench-genre-{i}')
+        for i in range(genres_per_title)
+    )
+    title_objects = Title.objects.bulk_create(
+        Title(name=f'Произведение {i}', year=2000, category=category,
+              description='Описание произведения ' * 10)
+        for i in range(titles)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title=title, genre=genre)
+        for title in title_objects for genre in genres
+    )
+    reviews = Review.objects.bulk_create(
+        Review(title=title, author=author, score=(i % 10) + 1,
+               text='Текст отзыва ' * 20)
+        for title in title_objects
+        for i, author in enumerate(authors[:reviews_per_title])
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=authors[i % len(authors)],
+                text='Текст комментария')
+        for review in reviews for i in range(comments_per_review)
+    )
+    Title.objects.rebuild_ratings()
+    Title.objects.rebuild_stats()
+    return title_objects
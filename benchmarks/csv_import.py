@@ -0,0 +1,105 @@
+"""
+Throughput and peak memory of `import_csv` on synthetic review files.
+
+Every size is imported by a fresh child process into a file-backed test
+database, so the reported peak RSS belongs to that import alone.
+
+    python -m benchmarks.csv_import --sizes 10000 1000000 10000000 \
+        --workers 1 4
+"""
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import BASE_DIR, report, setup_django, test_database
+
+USERS = 1000
+
+
+def write_csv(directory, name, header, rows):
+    with open(os.path.join(directory, name), 'w', encoding='utf-8',
+              newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate(directory, size):
+    """
+    Write a full set of seed files whose review.csv has `size` rows.
+    """
+    titles = -(-size // USERS)
+    write_csv(directory, 'category.csv', ('id', 'name', 'slug'),
+              ((1, 'Фильм', 'movie'),))
+    write_csv(directory, 'genre.csv', ('id', 'name', 'slug'),
+              ((1, 'Драма', 'drama'),))
+    write_csv(directory, 'users.csv', ('id', 'username', 'email', 'role'),
+              ((i, f'user{i}', f'user{i}@yamdb.fake', 'user')
+               for i in range(1, USERS + 1)))
+    write_csv(directory, 'titles.csv', ('id', 'name', 'year', 'category_id'),
+              ((i, f'Произведение {i}', 2000, 1)
+               for i in range(1, titles + 1)))
+    write_csv(directory, 'genre_title.csv', ('id', 'title_id', 'genre_id'),
+              ((i, i, 1) for i in range(1, titles + 1)))
+    write_csv(directory, 'review.csv',
+              ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+              ((i, i // USERS + 1, 'Текст отзыва', i % USERS + 1,
+                i % 10 + 1, '2020-01-13T23:20:02.422Z')
+               for i in range(size)))
+    write_csv(directory, 'comments.csv',
+              ('id', 'review_id', 'text', 'author_id', 'pub_date'), ())
+
+
+def run_import(directory, batch_size, workers):
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection
+
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, 'bench.sqlite3'
+    )
+    with test_database():
+        start = time.perf_counter()
+        call_command('import_csv', directory=directory,
+                     batch_size=batch_size, workers=workers, verbosity=0,
+                     stdout=open(os.devnull, 'w'))
+        elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f'{elapsed} {peak}')
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1])
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return run_import(args.child, args.batch_size, args.workers[0])
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            generate(directory, size)
+            for workers in args.workers:
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.csv_import',
+                     '--child', directory,
+                     '--batch-size', str(args.batch_size),
+                     '--workers', str(workers)],
+                    cwd=BASE_DIR, check=True, capture_output=True, text=True
+                ).stdout.split()
+                elapsed, peak = float(output[-2]), int(output[-1])
+                name = f'{size:,} reviews, {workers} workers'
+                report(name, size / elapsed, 'rows/s')
+                report(f'{name} peak RSS', peak / 1024, 'MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Rows per second serialized and rendered for titles, reviews and comments:
+model instances through `ModelSerializer` and DRF's `JSONRenderer`, versus
+`values_list()` rows through the row path and `FastJSONRenderer`.
+
+    python -m benchmarks.fast_rendering --repeat 50 --rows 1000
+"""
+from benchmarks.common import (argument_parser, measure, report,
+                               seed_catalog, setup_django, test_database)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(repeat=50)
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='Rows serialized per iteration.')
+    args = parser.parse_args()
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from api.renderers import FastJSONRenderer, orjson
+    from api.serializers import (CommentSerializer, ReviewSerializer,
+                                 TitleSerializer)
+    from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+    with test_database():
+        seed_catalog(titles=args.rows, reviews_per_title=10,
+                     comments_per_review=1)
+        cases = (
+            ('titles', TitleSerializer, TitleViewSet.queryset),
+            ('reviews', ReviewSerializer, ReviewViewSet.queryset),
+            ('comments', CommentSerializer, CommentViewSet.queryset),
+        )
+        if orjson is None:
+            print('orjson is not installed, FastJSONRenderer falls back '
+                  'to the stdlib encoder')
+        for name, serializer_class, queryset in cases:
+            queryset = queryset.order_by('pk')[:args.rows]
+
+            def instances():
+                data = serializer_class(queryset, many=True).data
+                return JSONRenderer().render(data)
+
+            def rows():
+                child = serializer_class()
+                columns, _ = child.row_fields
+                page = list(queryset.prefetch_related(None).values_list(
+                    *columns, 'pk', named=True
+                ))
+                data = child.rows_to_representation(page)
+                return FastJSONRenderer().render(data)
+
+            assert instances() == rows()
+            for label, func in (('instances', instances), ('rows', rows)):
+                rate = measure(func, args.repeat) * args.rows
+                report(f'{name} ({label})', rate, 'rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Cleanup rate of a comment spam wave: per-object DELETE versus bulk deletes.
+
+    python -m benchmarks.moderation --comments 50000 --repeat 200
+"""
+import time
+
+from benchmarks.common import (argument_parser, report, seed_catalog,
+                               setup_django, test_database)
+
+
+def seed_spam(count, spammer):
+    from reviews.models import Comment, Review
+
+    reviews = list(Review.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        (Comment(review_id=reviews[i % len(reviews)], author=spammer,
+                 text=f'Спам {i}') for i in range(count)),
+        batch_size=5000
+    )
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--comments', type=int, default=50000,
+                        help='Number of spam comments to clean up.')
+    args = parser.parse_args()
+    setup_django()
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import MODERATOR, Author, Comment
+
+    with test_database():
+        seed_catalog(titles=20, reviews_per_title=20, comments_per_review=0)
+        moderator = Author.objects.create(username='moderator',
+                                          role=MODERATOR,
+                                          email='moderator@yamdb.fake')
+        spammer = Author.objects.create(username='spammer',
+                                        email='spammer@yamdb.fake')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(moderator)}'
+        )
+
+        seed_spam(args.repeat, spammer)
+        comments = Comment.objects.select_related('review')
+        start = time.perf_counter()
+        for comment in comments:
+            client.delete(f'/api/v1/titles/{comment.review.title_id}/'
+                          f'reviews/{comment.review_id}/comments/'
+                          f'{comment.pk}/')
+        report('per-object DELETE',
+               args.repeat / (time.perf_counter() - start), 'comments/s')
+
+        seed_spam(args.comments, spammer)
+        comment = Comment.objects.select_related('review').first()
+        ids = list(Comment.objects.filter(
+            review_id=comment.review_id
+        ).values_list('pk', flat=True))
+        start = time.perf_counter()
+        client.post(f'/api/v1/titles/{comment.review.title_id}/reviews/'
+                    f'{comment.review_id}/comments/bulk_delete/',
+                    data={'ids': ids}, format='json')
+        report(f'comments bulk_delete ({len(ids)} ids)',
+               len(ids) / (time.perf_counter() - start), 'comments/s')
+
+        count = Comment.objects.count()
+        start = time.perf_counter()
+        client.post('/api/v1/users/spammer/delete_content/')
+        elapsed = time.perf_counter() - start
+        report(f'users delete_content ({count} comments)', count / elapsed,
+               'comments/s')
+        report('users delete_content wall time', elapsed, 's')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Throughput of the cached read endpoints with and without the response cache.
+
+    python -m benchmarks.response_cache --repeat 500
+"""
+from benchmarks.common import (argument_parser, measure, report,
+                               seed_catalog, setup_django, test_database)
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+    setup_django()
+    from django.core.cache import cache
+    from django.test import Client, override_settings
+
+    from reviews.models import Review
+
+    with test_database():
+        title = seed_catalog(titles=20, reviews_per_title=50)[0]
+        review = Review.objects.filter(title=title).first()
+        client = Client()
+        urls = {
+            'title detail': f'/api/v1/titles/{title.pk}/',
+            'reviews list': f'/api/v1/titles/{title.pk}/reviews/',
+            'comments list': (f'/api/v1/titles/{title.pk}/reviews/'
+                              f'{review.pk}/comments/'),
+        }
+        for name, url in urls.items():
+            for enabled in (False, True):
+                cache.clear()
+                with override_settings(API_CACHE_ENABLED=enabled):
+                    rate = measure(lambda: client.get(url), args.repeat)
+                label = 'cached' if enabled else 'uncached'
+                report(f'{name} ({label})', rate, 'req/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Latency of `/api/v1/search/` with the FTS5 index and the `icontains` scan.
+
+    python -m benchmarks.search --rows 1000000 --repeat 20
+"""
+import random
+
+from benchmarks.common import (argument_parser, measure, report,
+                               seed_catalog, setup_django, test_database)
+
+WORDS = (
+    'фильм сюжет актёр режиссёр финал драма комедия музыка сцена герой '
+    'книга автор глава роман история детектив загадка песня альбом звук'
+).split()
+QUERIES = ('финал', 'детектив загадка', 'редкоеслово')
+BATCH_SIZE = 10000
+
+
+def seed_comments(rows):
+    from reviews.models import Author, Comment, Review
+
+    rng = random.Random(0)
+    author = Author.objects.first()
+    review_ids = list(Review.objects.values_list('pk', flat=True))
+    for start in range(0, rows, BATCH_SIZE):
+        Comment.objects.bulk_create(
+            Comment(review_id=rng.choice(review_ids), author=author,
+                    text=' '.join(rng.choices(WORDS, k=12)))
+            for _ in range(start, min(start + BATCH_SIZE, rows))
+        )
+    Comment.objects.create(review_id=review_ids[0], author=author,
+                           text='редкоеслово')
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--rows', type=int, default=1000000,
+                        help='Number of synthetic comments to index.')
+    parser.set_defaults(repeat=20)
+    args = parser.parse_args()
+    setup_django()
+    from django.test import Client
+
+    from api import views
+    from reviews import search
+
+    with test_database():
+        seed_catalog(titles=100, reviews_per_title=10, comments_per_review=0)
+        seed_comments(args.rows)
+        search.Fts5SearchBackend().rebuild()
+        client = Client()
+        backends = {
+            'fts5': search.Fts5SearchBackend,
+            'icontains': search.DatabaseSearchBackend,
+        }
+        for name, backend in backends.items():
+            views.get_backend = backend
+            for query in QUERIES:
+                rate = measure(
+                    lambda: client.get('/api/v1/search/', {'q': query}),
+                    args.repeat
+                )
+                report(f'search {query!r} ({name})', 1000 / rate, 'ms/req')
+
+
+if __name__ == '__main__':
+    main()
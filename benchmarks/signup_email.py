@@ -0,0 +1,90 @@
+"""
+Signup latency with the confirmation email sent inside the request versus
+handed to the background queue, against a simulated SMTP server.
+
+The simulated server pays `--connect-ms` per connection and `--send-ms` per
+message, so the drain rate also shows the gain of batching messages over one
+connection.
+
+    python -m benchmarks.signup_email --connect-ms 150 --send-ms 50 --repeat 50
+"""
+import os
+import tempfile
+import time
+
+from django.core.mail.backends.locmem import EmailBackend
+
+from benchmarks.common import (argument_parser, report, setup_django,
+                               test_database)
+
+
+class SlowEmailBackend(EmailBackend):
+    connect_delay = send_delay = 0
+
+    def open(self):
+        time.sleep(self.connect_delay)
+        return True
+
+    def send_messages(self, messages):
+        time.sleep(self.send_delay * len(messages))
+        return super().send_messages(messages)
+
+
+def signup_latency(client, label, repeat):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        client.post('/api/v1/auth/signup/',
+                    data={'username': f'{label}{i}',
+                          'email': f'{label}{i}@yamdb.fake'})
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--connect-ms', type=float, default=150,
+                        help='Simulated SMTP connection setup time.')
+    parser.add_argument('--send-ms', type=float, default=50,
+                        help='Simulated SMTP time per message.')
+    parser.set_defaults(repeat=50)
+    args = parser.parse_args()
+    setup_django()
+    # Configure the class the email settings import, not the `__main__` copy
+    from benchmarks.signup_email import SlowEmailBackend
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.utils import timezone
+
+    from api.mail import deliver_due, get_queue
+    from reviews.models import OutgoingEmail
+
+    SlowEmailBackend.connect_delay = args.connect_ms / 1000
+    SlowEmailBackend.send_delay = args.send_ms / 1000
+    directory = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, 'bench.sqlite3'
+    )
+    email_backend = 'benchmarks.signup_email.SlowEmailBackend'
+    with test_database(), override_settings(EMAIL_BACKEND=email_backend):
+        client = Client()
+        for label, backend in (('inline', 'api.mail.ImmediateEmailQueue'),
+                               ('queued', 'api.mail.ThreadPoolEmailQueue')):
+            with override_settings(EMAIL_QUEUE_BACKEND=backend):
+                median, p95 = signup_latency(client, label, args.repeat)
+                get_queue().join()
+            report(f'signup ({label} email) median', median * 1000, 'ms')
+            report(f'signup ({label} email) p95', p95 * 1000, 'ms')
+
+        for batch_size in (1, 100):
+            OutgoingEmail.objects.update(status=OutgoingEmail.PENDING,
+                                         next_attempt=timezone.now())
+            start = time.perf_counter()
+            sent = deliver_due(batch_size)
+            report(f'outbox drain (batch size {batch_size})',
+                   sent / (time.perf_counter() - start), 'emails/s')
+
+
+if __name__ == '__main__':
+    main()
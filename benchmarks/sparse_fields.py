@@ -0,0 +1,43 @@
+"""
+Response size and time per page of the title, review and comment lists in
+their full representation versus a minimal `?fields=` selection (with the
+response cache off).
+
+    python -m benchmarks.sparse_fields --repeat 300
+"""
+from benchmarks.common import (argument_parser, measure, report,
+                               seed_catalog, setup_django, test_database)
+
+
+def main():
+    args = argument_parser(__doc__).parse_args()
+    setup_django()
+    from django.test import Client, override_settings
+
+    from reviews.models import Review
+
+    with test_database(), override_settings(API_CACHE_ENABLED=False):
+        title = seed_catalog(titles=50, reviews_per_title=100,
+                             comments_per_review=2)[0]
+        review = Review.objects.filter(title=title).first()
+        reviews = f'/api/v1/titles/{title.pk}/reviews/?page_size=100'
+        cases = {
+            'titles': ('/api/v1/titles/', 'id,name,rating'),
+            'reviews': (reviews, 'id,score'),
+            'comments': (f'/api/v1/titles/{title.pk}/reviews/{review.pk}'
+                         f'/comments/', 'id,author'),
+        }
+        client = Client()
+        for name, (url, fields) in cases.items():
+            separator = '&' if '?' in url else '?'
+            variants = (('full', url),
+                        ('minimal', f'{url}{separator}fields={fields}'))
+            for label, variant in variants:
+                size = len(client.get(variant).content)
+                rate = measure(lambda: client.get(variant), args.repeat)
+                report(f'{name} ({label})', size, 'bytes/page')
+                report(f'{name} ({label}) time', 1000 / rate, 'ms/page')
+
+
+if __name__ == '__main__':
+    main()
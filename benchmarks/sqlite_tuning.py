@@ -0,0 +1,135 @@
+"""
+Reader latency of the review feed while reviews are written continuously,
+with the stock SQLite settings and with the `SQLITE_TUNING` profile.
+
+One writer thread creates reviews back to back while reader threads fetch
+review feeds through the API (with the response cache off), against a file
+database.
+
+    python -m benchmarks.sqlite_tuning --readers 4 --seconds 5
+"""
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import (argument_parser, report, seed_catalog,
+                               setup_django, test_database)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Workload:
+    """
+    One writer creating reviews and readers fetching review feeds until
+    `stop` is set.
+    """
+
+    def __init__(self, titles, authors):
+        self.titles = titles
+        self.authors = authors
+        self.stop = threading.Event()
+        self.latencies = []
+        self.written = 0
+        self.errors = []
+
+    def write(self):
+        from reviews.models import Review
+
+        pairs = ((title, author) for author in self.authors
+                 for title in self.titles)
+        for title, author in pairs:
+            if self.stop.is_set():
+                return
+            Review.objects.create(title=title, author=author, score=7,
+                                  text='Текст отзыва')
+            self.written += 1
+
+    def read(self, offset):
+        from django.test import Client
+
+        client = Client()
+        index = offset
+        while not self.stop.is_set():
+            title = self.titles[index % len(self.titles)]
+            index += 1
+            start = time.perf_counter()
+            client.get(f'/api/v1/titles/{title.pk}/reviews/')
+            self.latencies.append(time.perf_counter() - start)
+
+    def thread(self, target, *args):
+        from django.db import connection
+
+        def run():
+            try:
+                target(*args)
+            except Exception as exc:
+                self.errors.append(exc)
+            finally:
+                connection.close()
+
+        return threading.Thread(target=run)
+
+    def run(self, readers, seconds):
+        threads = [self.thread(self.write)] + [
+            self.thread(self.read, i) for i in range(readers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--readers', type=int, default=4,
+                        help='Number of concurrent reader threads.')
+    parser.add_argument('--seconds', type=float, default=5,
+                        help='Duration of each case.')
+    args = parser.parse_args()
+    setup_django()
+    from django.db import connection
+    from django.test import override_settings
+
+    from reviews.models import Author, Review
+
+    directory = tempfile.mkdtemp()
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        directory, 'bench.sqlite3'
+    )
+    with test_database(), override_settings(API_CACHE_ENABLED=False):
+        titles = seed_catalog(titles=20, reviews_per_title=0,
+                              comments_per_review=0)
+        authors = Author.objects.bulk_create(
+            Author(username=f'writer{i}', email=f'writer{i}@yamdb.fake')
+            for i in range(5000)
+        )
+        # WAL mode sticks to the database file, so the stock case runs first
+        for label, tuning in (('stock', False), ('tuned', True)):
+            Review.objects.all().delete()
+            connection.close()
+            workload = Workload(titles, authors)
+            with override_settings(SQLITE_TUNING=tuning):
+                workload.run(args.readers, args.seconds)
+            connection.close()
+            latencies = workload.latencies
+            report(f'reader median ({label})',
+                   percentile(latencies, 0.5) * 1000, 'ms')
+            report(f'reader p99 ({label})',
+                   percentile(latencies, 0.99) * 1000, 'ms')
+            report(f'reader max ({label})', max(latencies) * 1000, 'ms')
+            report(f'reads ({label})', len(latencies) / args.seconds,
+                   'req/s')
+            report(f'review writes ({label})', workload.written / args.seconds,
+                   'writes/s')
+
+
+if __name__ == '__main__':
+    main()
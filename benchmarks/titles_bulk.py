@@ -0,0 +1,66 @@
+"""
+Title ingestion rate of the per-item and the bulk create endpoints.
+
+    python -m benchmarks.titles_bulk --rows 5000 --batch-size 1000
+"""
+import time
+
+from benchmarks.common import (argument_parser, report, setup_django,
+                               test_database)
+
+
+def payload(start, count, genres, categories):
+    return [
+        {'name': f'Произведение {i}', 'year': 1900 + i % 120,
+         'genre': [genres[i % len(genres)], genres[(i + 1) % len(genres)]],
+         'category': categories[i % len(categories)],
+         'description': 'Описание произведения'}
+        for i in range(start, start + count)
+    ]
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--rows', type=int, default=5000,
+                        help='Number of titles created by each endpoint.')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Number of titles per bulk request.')
+    args = parser.parse_args()
+    setup_django()
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import ADMIN, Author, Category, Genre
+
+    with test_database():
+        admin = Author.objects.create(username='bench', role=ADMIN,
+                                      email='bench@yamdb.fake')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        genres = [Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+                  for i in range(5)]
+        categories = [Category.objects.create(name=f'Кат {i}', slug=f'c-{i}')
+                      for i in range(3)]
+        genres = [genre.slug for genre in genres]
+        categories = [category.slug for category in categories]
+
+        start = time.perf_counter()
+        for item in payload(0, args.rows, genres, categories):
+            client.post('/api/v1/titles/', data=item, format='json')
+        report('per-item POST /titles/',
+               args.rows / (time.perf_counter() - start), 'rows/s')
+
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch_size):
+            count = min(args.batch_size, args.rows - offset)
+            client.post('/api/v1/titles/bulk/', format='json',
+                        data=payload(args.rows + offset, count, genres,
+                                     categories))
+        report(f'bulk POST /titles/bulk/ ({args.batch_size} per request)',
+               args.rows / (time.perf_counter() - start), 'rows/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,20 @@
 import os
 import csv
-from django.core.management.base import BaseCommand
+import hashlib
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+
 from MyMDb.settings import BASE_DIR
+from reviews import search
+from reviews.signals import post_bulk_load
 from reviews.models import (Author,
                             Comment,
                             Review,
@@ -10,6 +23,128 @@ from reviews.models import (Author,
                             Title,
                             GenreTitle)
 
+DEFAULT_BATCH_SIZE = 5000
+PROGRESS_INTERVAL = 5
+UPSERT_KEYS = {
+    Category: 'slug',
+    Genre: 'slug',
+    Author: 'username',
+}
+# How the rows that feed the rating and stats counters reach their title
+TITLE_PATHS = {
+    Title: 'pk',
+    Review: 'title_id',
+    Comment: 'review__title_id',
+}
+SEARCH_KINDS = {
+    Title: search.TITLE,
+    Review: search.REVIEW,
+    Comment: search.COMMENT,
+}
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def clean_batch(model_label, first_row, rows):
+    """
+    Convert raw csv values to python values and run the field validators.
+
+    Runs in the worker processes, so it must not touch the database:
+    foreign keys are only converted, their existence is left to the
+    database constraints. Returns (row number, values) pairs and
+    (row number, message) errors.
+    """
+    model = apps.get_model(model_label)
+    fields = {column: model._meta.get_field(column) for column in rows[0]}
+    cleaned, errors = [], []
+    for number, row in enumerate(rows, first_row):
+        try:
+            data = {}
+            for column, field in fields.items():
+                value = row[column]
+                if not field.is_relation:
+                    data[column] = field.clean(value, None)
+                elif value == '' and field.null:
+                    data[column] = None
+                else:
+                    data[column] = field.to_python(value)
+        except ValidationError as error:
+            errors.append((number, f'{column}: {"; ".join(error.messages)}'))
+        else:
+            cleaned.append((number, data))
+    return cleaned, errors
+
+
+def compare_rows(incoming, stored):
+    """
+    Compare the incoming `(obj, (content hash, claims))` rows with the
+    stored `(content hash, claims)`, both keyed by the upsert key.
+
+    Returns the counts, the objects to write and the keys of the stored
+    rows whose token claims change.
+    """
+    counts = Counter()
+    changed, revoked = [], []
+    for value, (obj, (content_hash, claims)) in incoming.items():
+        if value not in stored:
+            counts['inserted'] += 1
+        elif stored[value][0] == content_hash:
+            counts['unchanged'] += 1
+            continue
+        else:
+            counts['updated'] += 1
+            if stored[value][1] != claims:
+                revoked.append(value)
+        changed.append(obj)
+    return counts, changed, revoked
+
+
+def dependency_stages(models):
+    """
+    Group models into stages whose foreign keys only point to earlier ones.
+    """
+    pending = {
+        model: {
+            field.related_model for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in models
+            and field.related_model is not model
+        }
+        for model in models
+    }
+    stages, loaded = [], set()
+    while pending:
+        stage = [model for model, parents in pending.items()
+                 if parents <= loaded]
+        if not stage:
+            names = ', '.join(model.__name__ for model in pending)
+            raise CommandError(f'Circular foreign keys between {names}.')
+        for model in stage:
+            del pending[model]
+        loaded.update(stage)
+        stages.append(stage)
+    return stages
+
+
+class InlineExecutor:
+    """
+    Executor stand-in that runs every job in the calling process.
+    """
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
 
 class Command(BaseCommand):
     help = "This command writes csv data to models."
@@ -24,19 +159,376 @@ class Command(BaseCommand):
         'comments.csv': Comment,
     }
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Number of rows written per transaction.'
+        )
+        parser.add_argument(
+            '--directory',
+            default=os.path.join(BASE_DIR, 'static/data/'),
+            help='Directory with the csv files.'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help='Insert new and update changed rows instead of reloading.'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of processes parsing and validating csv rows.'
+        )
+
     def handle(self, *args, **options):
-        csv_directory = os.path.join(BASE_DIR, 'static/data/')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+        workers = options['workers']
+        if workers < 1:
+            raise CommandError('--workers must be a positive integer.')
+        self.csv_directory = options['directory']
+        self.upsert_mode = options['upsert']
+        self.files = {
+            model: csv_file for csv_file, model in self.MODELS_DICT.items()
+        }
+        self.stages = dependency_stages(list(self.files))
+        self.stage_of = {
+            model: number
+            for number, stage in enumerate(self.stages, 1) for model in stage
+        }
+        self.counts = {model: Counter() for model in self.files}
+        # csv id -> database id of the rows upserted by natural key
+        self.key_maps = {model: {} for model in UPSERT_KEYS}
+        # Titles and indexed rows touched by the upsert
+        self.titles = set()
+        self.reindexed = {model: set() for model in SEARCH_KINDS}
+        self.started, self.reported, self.stage_started = {}, {}, {}
+
+        if not self.upsert_mode:
+            for stage in reversed(self.stages):
+                for model in reversed(stage):
+                    self.clear(model, batch_size)
+
+        executor = (ProcessPoolExecutor(workers, initializer=django.setup)
+                    if workers > 1 else InlineExecutor())
+        window = deque()
+        with executor:
+            for model, first_row, rows in self.read(batch_size):
+                future = None if rows is None else executor.submit(
+                    clean_batch, model._meta.label, first_row, rows
+                )
+                window.append((model, future))
+                if len(window) > 2 * workers:
+                    self.write(*window.popleft())
+            while window:
+                self.write(*window.popleft())
+
+        if self.upsert_mode:
+            self.refresh(batch_size)
+        else:
+            self.rebuild()
 
-        for csv_file, model in self.MODELS_DICT.items():
-            with open(csv_directory + csv_file, encoding='utf-8') as csv_data:
-                dict_reader = csv.DictReader(csv_data)
-                model.objects.all().delete()
+    def rebuild(self):
+        """
+        Recompute ratings, stats and the search index of the whole catalog.
+        """
+        Title.objects.rebuild_ratings()
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt ratings'))
+        Title.objects.rebuild_stats()
+        self.stdout.write(
+            self.style.SUCCESS('Successfully rebuilt title stats')
+        )
+        with transaction.atomic():
+            search.get_backend().rebuild()
+        self.stdout.write(
+            self.style.SUCCESS('Successfully rebuilt search index')
+        )
+        post_bulk_load.send(sender=self.__class__)
+
+    def refresh(self, batch_size):
+        """
+        Recompute ratings, stats and the search index of the rows the upsert
+        inserted or updated only, and nothing at all when no row changed.
+        """
+        if not any(counts['inserted'] or counts['updated']
+                   for counts in self.counts.values()):
+            self.stdout.write('No rows changed, nothing to refresh')
+            return
+        for pks in batches(sorted(self.titles), batch_size):
+            titles = Title.objects.filter(pk__in=pks)
+            titles.rebuild_ratings()
+            titles.rebuild_stats(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully refreshed ratings and stats of '
+            f'{len(self.titles)} titles'
+        ))
+        # A review moved to another title moves its comments with it
+        self.reindexed[Comment].update(Comment.objects.filter(
+            review_id__in=self.reindexed[Review]
+        ).values_list('pk', flat=True))
+        backend = search.get_backend()
+        with transaction.atomic():
+            for model, kind in SEARCH_KINDS.items():
+                queryset = model.objects.order_by()
+                if model is Comment:
+                    queryset = queryset.select_related('review')
+                for pks in batches(sorted(self.reindexed[model]),
+                                   batch_size):
+                    backend.index_many(kind, queryset.filter(pk__in=pks))
+        reindexed = sum(map(len, self.reindexed.values()))
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully reindexed {reindexed} rows'
+        ))
+        post_bulk_load.send(sender=self.__class__)
+
+    def clear(self, model, batch_size):
+        """
+        Delete every row of the model one batch at a time, without loading
+        the rows or sending `post_delete`, like `ContentQuerySet.bulk_delete`.
+
+        Models of the import are cleared children first, so only rows of
+        other models still point at the batch; they are deleted first (or
+        their links set to null). Ratings, stats, the search index and the
+        caches are rebuilt after the import anyway.
+        """
+        dependents = [
+            (relation.related_model, relation.field)
+            for relation in model._meta.related_objects
+            if not relation.many_to_many
+            and relation.related_model not in self.files
+        ] + [
+            (field.remote_field.through,
+             field.remote_field.through._meta.get_field(
+                 field.m2m_field_name()
+             ))
+            for field in model._meta.many_to_many
+            if field.remote_field.through not in self.files
+        ]
+        queryset = model.objects.order_by('pk')
+        while pks := list(queryset.values_list('pk', flat=True)[:batch_size]):
+            with transaction.atomic(using=queryset.db):
+                for related_model, field in dependents:
+                    rows = related_model._base_manager.filter(
+                        **{f'{field.name}__in': pks}
+                    )
+                    if field.remote_field.on_delete is models.SET_NULL:
+                        rows.update(**{field.name: None})
+                    else:
+                        rows._raw_delete(rows.db)
+                model.objects.filter(pk__in=pks)._raw_delete(queryset.db)
+
+    def read(self, batch_size):
+        """
+        Yield (model, first row number, rows) batches in dependency order,
+        followed by an empty batch that marks the end of every file.
+        """
+        for stage in self.stages:
+            for model in stage:
+                path = os.path.join(self.csv_directory, self.files[model])
+                with open(path, encoding='utf-8', newline='') as csv_data:
+                    first_row = 2
+                    for batch in batches(csv.DictReader(csv_data),
+                                         batch_size):
+                        yield model, first_row, batch
+                        first_row += len(batch)
+                yield model, None, None
+
+    def write(self, model, future):
+        """
+        Write one cleaned batch, or report the file once its end is reached.
+        """
+        now = time.monotonic()
+        self.stage_started.setdefault(self.stage_of[model], now)
+        self.started.setdefault(model, now)
+        if future is None:
+            return self.finish(model)
+
+        cleaned, errors = future.result()
+        if self.upsert_mode and cleaned:
+            cleaned, remap_errors = self.remap(model, cleaned)
+            errors += remap_errors
+        counts = self.counts[model]
+        for number, message in errors:
+            self.stderr.write(f'{self.files[model]}, row {number}: {message}')
+        counts['skipped'] += len(errors)
+        with transaction.atomic():
+            if self.upsert_mode:
+                counts.update(self.upsert(model, cleaned) if cleaned else {})
+            else:
                 model.objects.bulk_create(
-                    model(**data) for data in dict_reader
+                    model(**data) for _, data in cleaned
                 )
-            success_msg = (
-                f'Successfully import {csv_file} file to {model.__name__} model'
-            )
+                counts['inserted'] += len(cleaned)
+
+        now = time.monotonic()
+        reported = self.reported.setdefault(model, self.started[model])
+        if now - reported >= PROGRESS_INTERVAL:
+            self.reported[model] = now
+            rows = self.written(model)
             self.stdout.write(
-                self.style.SUCCESS(success_msg)
+                f'{model.__name__}: {rows} rows '
+                f'({rows / (now - self.started[model]):,.0f} rows/s)'
+            )
+
+    def written(self, model):
+        counts = self.counts[model]
+        return counts['inserted'] + counts['updated'] + counts['unchanged']
+
+    def finish(self, model):
+        counts = self.counts[model]
+        rows = self.written(model)
+        elapsed = time.monotonic() - self.started[model]
+        success_msg = (
+            f'Successfully import {self.files[model]} file to '
+            f'{model.__name__} model: {rows} rows in {elapsed:.1f}s '
+            f'({rows / max(elapsed, 1e-9):,.0f} rows/s)'
+        )
+        if self.upsert_mode:
+            success_msg += (
+                f', inserted {counts["inserted"]}, '
+                f'updated {counts["updated"]}, '
+                f'unchanged {counts["unchanged"]}'
             )
+        if counts['skipped']:
+            success_msg += f', skipped {counts["skipped"]} invalid rows'
+        self.stdout.write(
+            self.style.SUCCESS(success_msg)
+        )
+
+        stage = self.stage_of[model]
+        if model is self.stages[stage - 1][-1]:
+            names = ', '.join(item.__name__ for item in self.stages[stage - 1])
+            elapsed = time.monotonic() - self.stage_started[stage]
+            self.stdout.write(f'Stage {stage} ({names}) took {elapsed:.1f}s')
+
+    def remap(self, model, rows):
+        """
+        Point the foreign keys to models upserted by natural key at the
+        database ids of the csv rows they reference.
+
+        Returns the rows that could be remapped and errors for the others.
+        """
+        relations = []
+        for column in rows[0][1]:
+            field = model._meta.get_field(column)
+            if field.is_relation and field.related_model in self.key_maps:
+                relations.append((column, field.related_model))
+        if not relations:
+            return rows, []
+        remapped, errors = [], []
+        for number, data in rows:
+            for column, related_model in relations:
+                value = data[column]
+                if value is None:
+                    continue
+                try:
+                    data[column] = self.key_maps[related_model][value]
+                except KeyError:
+                    errors.append((number, f'{column}: no row with id '
+                                           f'{value} in '
+                                           f'{self.files[related_model]}'))
+                    break
+            else:
+                remapped.append((number, data))
+        return remapped, errors
+
+    def upsert(self, model, rows):
+        """
+        Write the new and changed rows of the batch, skipping rows whose
+        content hash matches the stored one.
+
+        Rows matched by a natural key keep their database ids, which may
+        differ from the csv ones; the mapping is recorded for `remap`.
+        Authors whose token claims change get their tokens revoked, as
+        `Author.save` would do.
+        """
+        batch = [data for _, data in rows]
+        key = UPSERT_KEYS.get(model, 'id')
+        key_field = model._meta.get_field(key)
+        fields = [
+            field for field in map(model._meta.get_field, batch[0])
+            if not getattr(field, 'auto_now_add', False)
+            and not (field.primary_key and key != 'id')
+        ]
+        claimed = [index for index, field in enumerate(fields)
+                   if field.name in getattr(model, 'TOKEN_CLAIM_FIELDS', ())]
+
+        def digest(values):
+            content = '\x1f'.join(map(str, values))
+            return hashlib.sha1(content.encode()).hexdigest(), tuple(
+                values[index] for index in claimed
+            )
+
+        incoming = {}
+        for data in batch:
+            obj = model(**data)
+            if key != 'id':
+                obj.pk = None
+            values = [field.to_python(getattr(obj, field.attname))
+                      for field in fields]
+            incoming[key_field.to_python(data[key])] = (obj, digest(values))
+        stored = {
+            row[0]: digest(row[1:])
+            for row in model.objects.filter(
+                **{f'{key}__in': incoming}
+            ).values_list(key, *(field.attname for field in fields))
+        }
+
+        counts, changed, revoked = compare_rows(incoming, stored)
+        if changed:
+            self.write_changed(model, key, fields, changed)
+        if model in self.key_maps:
+            self.record_key_map(model, batch)
+        if revoked:
+            model.revoke_tokens(list(model.objects.filter(
+                **{f'{key}__in': revoked}
+            ).values_list('pk', flat=True)))
+        return counts
+
+    def write_changed(self, model, key, fields, changed):
+        """
+        Insert or update the changed rows and note the titles and search
+        index rows they touch, before and after the write.
+        """
+        pks = [obj.pk for obj in changed]
+        if model in TITLE_PATHS:
+            self.titles.update(self.title_ids(model, pks))
+        model.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=(key,),
+            update_fields=[field.name for field in fields
+                           if field.name not in (key, 'id')],
+        )
+        if model in TITLE_PATHS:
+            self.titles.update(self.title_ids(model, pks))
+        if model in SEARCH_KINDS:
+            self.reindexed[model].update(pks)
+
+    @staticmethod
+    def title_ids(model, pks):
+        if model is Title:
+            return pks
+        return model.objects.filter(pk__in=pks).values_list(
+            TITLE_PATHS[model], flat=True
+        )
+
+    def record_key_map(self, model, batch):
+        """
+        Record the database id of every csv row of `batch`, matched by the
+        natural key of `model`.
+        """
+        key = UPSERT_KEYS[model]
+        key_field = model._meta.get_field(key)
+        values = [key_field.to_python(data[key]) for data in batch]
+        pks = dict(model.objects.filter(
+            **{f'{key}__in': values}
+        ).values_list(key, 'pk'))
+        self.key_maps[model].update(
+            (data['id'], pks[value]) for data, value in zip(batch, values)
+            if data.get('id') is not None
+        )
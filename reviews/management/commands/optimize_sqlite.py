@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews.sqlite import optimize
+
+
+class Command(BaseCommand):
+    help = ("This command refreshes the SQLite query planner statistics "
+            "and checkpoints the write-ahead log.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to optimize.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(
+                f'Database {options["database"]} is not an SQLite database'
+            )
+        busy, log, checkpointed = optimize(connection)
+        if log < 0:
+            checkpoint = 'not in WAL mode'
+        else:
+            checkpoint = f'checkpointed {checkpointed} of {log} WAL frames'
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully optimized {options["database"]}: {checkpoint}'
+        ))
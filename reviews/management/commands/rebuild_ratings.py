@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.signals import post_bulk_load
+
+
+class Command(BaseCommand):
+    help = "This command recomputes stored title ratings from reviews."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Title.objects.rebuild_ratings()
+            post_bulk_load.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {updated} title ratings')
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "This command rebuilds the full-text search index."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        with transaction.atomic():
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully rebuilt {type(backend).__name__} search index'
+        ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Title
+from reviews.signals import post_bulk_load
+
+
+class Command(BaseCommand):
+    help = ("This command recomputes the stored title statistics from "
+            "reviews and comments.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuilt = Title.objects.rebuild_stats()
+            post_bulk_load.send(sender=self.__class__)
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {rebuilt} title stats')
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.mail import deliver_due
+
+
+class Command(BaseCommand):
+    help = "This command sends the due messages of the email outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Messages sent per SMTP connection.')
+
+    def handle(self, *args, **options):
+        sent = deliver_due(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully sent {sent} queued emails'
+        ))
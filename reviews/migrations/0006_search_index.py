@@ -0,0 +1,48 @@
+from django.db import migrations
+
+# Frozen copies of the search backend's schema and rebuild queries, so that
+# later changes to `reviews.search` do not alter this migration
+CREATE_INDEX = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_search_index USING fts5('
+    'body, title_id UNINDEXED, review_id UNINDEXED, '
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+FILL_INDEX = (
+    'INSERT INTO reviews_search_index (rowid, body, title_id, review_id) '
+    "SELECT id * 4 + 1, name || ' ' || COALESCE(description, ''), id, NULL "
+    'FROM reviews_title',
+    'INSERT INTO reviews_search_index (rowid, body, title_id, review_id) '
+    'SELECT id * 4 + 2, text, title_id, NULL FROM reviews_review',
+    'INSERT INTO reviews_search_index (rowid, body, title_id, review_id) '
+    'SELECT c.id * 4 + 3, c.text, r.title_id, c.review_id '
+    'FROM reviews_comment c JOIN reviews_review r ON r.id = c.review_id',
+)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        if ('ENABLE_FTS5',) not in cursor.fetchall():
+            return
+    schema_editor.execute(CREATE_INDEX)
+    for sql in FILL_INDEX:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS reviews_search_index')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_api_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
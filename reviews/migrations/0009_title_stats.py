@@ -0,0 +1,60 @@
+# Generated by Django 4.2.6 on 2026-10-18 14:11
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def populate_title_stats(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    stats = {pk: TitleStats(title_id=pk)
+             for pk in Title.objects.values_list('pk', flat=True)}
+    reviews = Review.objects.order_by().values('title_id', 'score').annotate(
+        count=Count('pk'), last=Max('pub_date')
+    ).values_list('title_id', 'score', 'count', 'last')
+    comments = Comment.objects.order_by().values('review__title_id').annotate(
+        count=Count('pk'), last=Max('pub_date')
+    ).values_list('review__title_id', 'count', 'last')
+    for title_id, score, count, last in reviews:
+        row = stats[title_id]
+        setattr(row, f'score_{score}', count)
+        row.review_count += count
+        row.last_activity = max(filter(None, (row.last_activity, last)))
+    for title_id, count, last in comments:
+        row = stats[title_id]
+        row.comment_count = count
+        row.last_activity = max(filter(None, (row.last_activity, last)))
+    TitleStats.objects.bulk_create(stats.values(), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_author_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.title')),
+                ('score_1', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_2', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_3', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_4', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_5', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_6', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_7', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_8', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_9', models.PositiveIntegerField(default=0, editable=False)),
+                ('score_10', models.PositiveIntegerField(default=0, editable=False)),
+                ('review_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='review count')),
+                ('comment_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='comment count')),
+                ('last_activity', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='last activity')),
+            ],
+        ),
+        migrations.RunPython(populate_title_stats, migrations.RunPython.noop),
+    ]
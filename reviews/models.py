@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Avg, Count, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .validators import UnicodeUsernameValidator, validate_username
@@ -49,6 +52,9 @@ class Author(AbstractUser):
                               max_length=254)
     role = models.CharField(default=USER, choices=ROLES, max_length=9)
     bio = models.TextField(blank=True, null=True)
+    token_version = models.PositiveIntegerField(_("token version"),
+                                                default=0,
+                                                editable=False)
     first_name = models.CharField(_("first name"),
                                   max_length=150,
                                   blank=True)
@@ -56,6 +62,65 @@ class Author(AbstractUser):
                                  max_length=150,
                                  blank=True)
 
+    # Copied into access tokens (with `is_active` deciding whether they are
+    # accepted at all); changing any of them revokes the issued tokens
+    TOKEN_CLAIM_FIELDS = ('is_active', 'role', 'is_staff', 'is_superuser')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_claims = instance._token_claims()
+        instance._loaded_username = instance.__dict__.get('username')
+        return instance
+
+    def username_changed(self):
+        """
+        Whether the username differs from the loaded one; true when it is
+        unknown. Meant for `post_save` receivers.
+        """
+        loaded = getattr(self, '_loaded_username', None)
+        return loaded is None or loaded != self.username
+
+    def _token_claims(self):
+        return tuple(self.__dict__.get(field)
+                     for field in self.TOKEN_CLAIM_FIELDS)
+
+    def _claims_changed(self, update_fields):
+        if self._state.adding or (
+            update_fields is not None
+            and not set(update_fields) & set(self.TOKEN_CLAIM_FIELDS)
+        ):
+            return False
+        previous = getattr(self, '_loaded_claims', (None,))
+        if None in previous:
+            previous = Author.objects.filter(pk=self.pk).values_list(
+                *self.TOKEN_CLAIM_FIELDS
+            ).first()
+        return previous is not None and previous != self._token_claims()
+
+    def save(self, *args, **kwargs):
+        revoke = self._claims_changed(kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+        self._loaded_claims = self._token_claims()
+        self._loaded_username = self.username
+        if revoke:
+            Author.revoke_tokens([self.pk], using=self._state.db)
+            self.refresh_from_db(fields=('token_version',))
+
+    @classmethod
+    def revoke_tokens(cls, pks, using=None):
+        """
+        Move the `token_version` of the authors `pks` in one UPDATE, which
+        revokes every token issued to them so far.
+        """
+        from .signals import post_token_revoke
+
+        using = using or router.db_for_write(cls)
+        cls.objects.using(using).filter(pk__in=pks).update(
+            token_version=F('token_version') + 1
+        )
+        post_token_revoke.send(sender=cls, pks=list(pks), using=using)
+
     @property
     def is_admin(self):
         return self.role == ADMIN or self.is_superuser or self.is_staff
@@ -72,6 +137,9 @@ class Author(AbstractUser):
         ordering = ('id',)
         verbose_name = _('author')
         verbose_name_plural = _('authors')
+        indexes = [
+            models.Index(fields=('role',), name='author_role_idx'),
+        ]
 
 
 class Category(models.Model):
@@ -90,6 +158,60 @@ class Genre(models.Model):
                             max_length=50)
 
 
+class ContentQuerySet(models.QuerySet):
+    """
+    Reviews and comments with a set-based delete for moderation.
+    """
+    parent_field = None
+
+    def bulk_delete(self, batch_size=5000):
+        """
+        Delete the selected rows in `pk__in` batches without loading them or
+        sending `post_delete`, then send `post_bulk_delete` with the deleted
+        `(pk, parent id)` rows. Returns the number of deleted rows.
+
+        `QuerySet._raw_delete` is private API: a plain DELETE that skips the
+        collector. That is safe here because nothing points at a comment and
+        `ReviewQuerySet.bulk_delete` deletes the comments of the reviews
+        first, so no cascade is missed. The work of the `post_delete`
+        receivers (ratings, stats, search index) is done by the
+        `post_bulk_delete` receivers instead.
+        """
+        from .signals import post_bulk_delete
+
+        with transaction.atomic(using=self.db):
+            rows = list(
+                self.order_by().values_list('pk', self.parent_field)
+            )
+            pks = [pk for pk, _ in rows]
+            for start in range(0, len(pks), batch_size):
+                self.model.objects.filter(
+                    pk__in=pks[start:start + batch_size]
+                )._raw_delete(self.db)
+            if rows:
+                post_bulk_delete.send(sender=self.model, rows=rows,
+                                      using=self.db)
+        return len(rows)
+
+
+class CommentQuerySet(ContentQuerySet):
+    parent_field = 'review_id'
+
+
+class ReviewQuerySet(ContentQuerySet):
+    parent_field = 'title_id'
+
+    def bulk_delete(self, batch_size=5000):
+        """
+        Delete the reviews together with their comments.
+        """
+        with transaction.atomic(using=self.db):
+            Comment.objects.filter(
+                review__in=self.order_by().values('pk')
+            ).bulk_delete(batch_size)
+            return super().bulk_delete(batch_size)
+
+
 class Comment(models.Model):
     author = models.ForeignKey(to=Author, on_delete=models.CASCADE)
     text = models.CharField(_("text"), max_length=256)
@@ -98,6 +220,14 @@ class Comment(models.Model):
                                on_delete=models.CASCADE,
                                related_name='comments')
 
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('review', 'pub_date', 'id'),
+                         name='comment_review_feed_idx'),
+        ]
+
 
 class Review(models.Model):
     author = models.ForeignKey(to=Author, on_delete=models.CASCADE)
@@ -111,6 +241,49 @@ class Review(models.Model):
     ])
     pub_date = models.DateTimeField(_("publication date"), auto_now_add=True)
 
+    objects = ReviewQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = (instance.__dict__.get('title_id'),
+                                   instance.__dict__.get('score'))
+        return instance
+
+    def _previous_rating(self):
+        if self._state.adding:
+            return None
+        previous = getattr(self, '_loaded_rating', (None, None))
+        if previous[1] is None:
+            previous = Review.objects.filter(pk=self.pk).values_list(
+                'title_id', 'score'
+            ).first()
+        return previous
+
+    def save(self, *args, **kwargs):
+        previous = self._previous_rating()
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            score = int(self.score)
+            titles = Title.objects.filter(pk=self.title_id)
+            stats = TitleStats.objects.filter(title_id=self.title_id)
+            if previous is None:
+                titles.apply_rating_delta(score, 1)
+                stats.apply_review_delta(score, 1, self.pub_date)
+            elif previous[0] != self.title_id:
+                Title.objects.filter(pk=previous[0]).apply_rating_delta(
+                    -previous[1], -1
+                )
+                titles.apply_rating_delta(score, 1)
+                # The comments of the review move along with it
+                Title.objects.filter(
+                    pk__in=(previous[0], self.title_id)
+                ).rebuild_stats()
+            elif previous[1] != score:
+                titles.apply_rating_delta(score - previous[1], 0)
+                stats.move_review_score(previous[1], score)
+        self._loaded_rating = (self.title_id, score)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -118,6 +291,75 @@ class Review(models.Model):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(fields=('title', 'pub_date', 'id'),
+                         name='review_title_feed_idx'),
+        ]
+
+
+class TitleQuerySet(models.QuerySet):
+    def apply_rating_delta(self, score_delta, count_delta):
+        """
+        Shift the stored rating counters by the given deltas in one UPDATE.
+        """
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=(Cast(rating_sum, models.FloatField())
+                    / NullIf(rating_count, 0)),
+        )
+
+    def rebuild_ratings(self):
+        """
+        Recompute the stored rating counters from the reviews table.
+        """
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(average=Avg('score')).values('average')
+            ),
+        )
+
+    def rebuild_stats(self, batch_size=5000):
+        """
+        Recompute the `TitleStats` rows of the selected titles from the
+        reviews and comments tables. Returns the number of titles.
+        """
+        pks = list(self.order_by().values_list('pk', flat=True))
+        for start in range(0, len(pks), batch_size):
+            chunk = pks[start:start + batch_size]
+            stats = {pk: TitleStats(title_id=pk) for pk in chunk}
+            reviews = Review.objects.filter(title_id__in=chunk).order_by(
+            ).values('title_id', 'score').annotate(
+                count=Count('pk'), last=Max('pub_date')
+            ).values_list('title_id', 'score', 'count', 'last')
+            for title_id, score, count, last in reviews:
+                stats[title_id].add_reviews(score, count, last)
+            comments = Comment.objects.filter(
+                review__title_id__in=chunk
+            ).order_by().values('review__title_id').annotate(
+                count=Count('pk'), last=Max('pub_date')
+            ).values_list('review__title_id', 'count', 'last')
+            for title_id, count, last in comments:
+                stats[title_id].add_comments(count, last)
+            TitleStats.objects.bulk_create(
+                stats.values(), update_conflicts=True,
+                unique_fields=('title',),
+                update_fields=TitleStats.COUNTER_FIELDS,
+            )
+        return len(pks)
 
 
 class Title(models.Model):
@@ -134,6 +376,26 @@ class Title(models.Model):
                                  blank=True,
                                  null=True,
                                  choices=CATEGORIES)
+    rating_sum = models.PositiveIntegerField(_("rating sum"),
+                                             default=0,
+                                             editable=False)
+    rating_count = models.PositiveIntegerField(_("rating count"),
+                                               default=0,
+                                               editable=False)
+    rating = models.FloatField(_("rating"),
+                               blank=True,
+                               null=True,
+                               editable=False)
+
+    objects = TitleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+            models.Index(fields=('rating_count',),
+                         name='title_rating_count_idx'),
+        ]
 
 
 class GenreTitle(models.Model):
@@ -142,3 +404,137 @@ class GenreTitle(models.Model):
                               on_delete=models.SET_NULL,
                               blank=True,
                               null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('genre', 'title'),
+                         name='genre_title_genre_idx'),
+            models.Index(fields=('title', 'genre'),
+                         name='genre_title_title_idx'),
+        ]
+
+
+class OutgoingEmail(models.Model):
+    """
+    Outbox row of a message handed to the background email queue.
+    """
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = [
+        (PENDING, PENDING),
+        (SENT, SENT),
+        (FAILED, FAILED),
+    ]
+
+    subject = models.CharField(_("subject"), max_length=998)
+    body = models.TextField(_("body"))
+    from_email = models.CharField(_("from email"), max_length=254)
+    recipients = models.JSONField(_("recipients"))
+    status = models.CharField(default=PENDING, choices=STATUSES,
+                              max_length=7)
+    attempts = models.PositiveSmallIntegerField(_("attempts"), default=0)
+    next_attempt = models.DateTimeField(_("next attempt"),
+                                        default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True)
+    created = models.DateTimeField(_("created"), auto_now_add=True)
+    sent = models.DateTimeField(_("sent"), blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('status', 'next_attempt'),
+                         name='outgoing_email_due_idx'),
+        ]
+
+
+SCORES = range(1, 11)
+
+
+def score_field(score):
+    return f'score_{score}'
+
+
+class TitleStatsQuerySet(models.QuerySet):
+    def apply_review_delta(self, score, count_delta, activity=None):
+        """
+        Shift the histogram bucket of `score` and the review count in one
+        UPDATE, moving the last activity to `activity` if given.
+        """
+        field = score_field(score)
+        changes = {field: F(field) + count_delta,
+                   'review_count': F('review_count') + count_delta}
+        if activity is not None:
+            changes['last_activity'] = activity
+        return self.update(**changes)
+
+    def move_review_score(self, old_score, new_score):
+        """
+        Move one review from the histogram bucket of `old_score` to that of
+        `new_score` in one UPDATE.
+        """
+        old, new = score_field(old_score), score_field(new_score)
+        return self.update(**{old: F(old) - 1, new: F(new) + 1})
+
+    def apply_comment_delta(self, count_delta, activity=None):
+        changes = {'comment_count': F('comment_count') + count_delta}
+        if activity is not None:
+            changes['last_activity'] = activity
+        return self.update(**changes)
+
+
+class TitleStats(models.Model):
+    """
+    Review statistics of a title, kept up to date by the review and comment
+    hooks so that title cards can read them with a join.
+
+    `last_activity` is when the latest review or comment was posted; deletes
+    do not move it back until the stats are rebuilt.
+    """
+    title = models.OneToOneField(to=Title,
+                                 on_delete=models.CASCADE,
+                                 primary_key=True,
+                                 related_name='stats')
+    score_1 = models.PositiveIntegerField(default=0, editable=False)
+    score_2 = models.PositiveIntegerField(default=0, editable=False)
+    score_3 = models.PositiveIntegerField(default=0, editable=False)
+    score_4 = models.PositiveIntegerField(default=0, editable=False)
+    score_5 = models.PositiveIntegerField(default=0, editable=False)
+    score_6 = models.PositiveIntegerField(default=0, editable=False)
+    score_7 = models.PositiveIntegerField(default=0, editable=False)
+    score_8 = models.PositiveIntegerField(default=0, editable=False)
+    score_9 = models.PositiveIntegerField(default=0, editable=False)
+    score_10 = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(_("review count"),
+                                               default=0,
+                                               editable=False)
+    comment_count = models.PositiveIntegerField(_("comment count"),
+                                                default=0,
+                                                editable=False)
+    last_activity = models.DateTimeField(_("last activity"),
+                                         blank=True,
+                                         null=True,
+                                         editable=False)
+
+    objects = TitleStatsQuerySet.as_manager()
+
+    COUNTER_FIELDS = (*map(score_field, SCORES), 'review_count',
+                      'comment_count', 'last_activity')
+
+    @property
+    def histogram(self):
+        return {str(score): getattr(self, score_field(score))
+                for score in SCORES}
+
+    def add_reviews(self, score, count, last):
+        field = score_field(score)
+        setattr(self, field, getattr(self, field) + count)
+        self.review_count += count
+        self.touch(last)
+
+    def add_comments(self, count, last):
+        self.comment_count += count
+        self.touch(last)
+
+    def touch(self, activity):
+        if self.last_activity is None or activity > self.last_activity:
+            self.last_activity = activity
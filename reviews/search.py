@@ -0,0 +1,230 @@
+from functools import lru_cache
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+TITLE = 'title'
+REVIEW = 'review'
+COMMENT = 'comment'
+KINDS = (TITLE, REVIEW, COMMENT)
+
+
+class SearchResults:
+    """
+    Lazy, sliceable search results that Django's paginator can consume.
+    """
+
+    def __init__(self, backend, query):
+        self.backend = backend
+        self.query = query
+
+    def count(self):
+        return self.backend.count(self.query)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        return self.backend.fetch(self.query, start, stop - start)
+
+
+class BaseSearchBackend:
+    """
+    Interface of the full-text index over titles, reviews and comments.
+
+    Every hit is a dict with `type`, `id`, `title_id`, `review_id` and
+    `snippet` keys.
+    """
+
+    def index(self, kind, obj):
+        pass
+
+    def index_many(self, kind, objs):
+        for obj in objs:
+            self.index(kind, obj)
+
+    def remove(self, kind, pk):
+        pass
+
+    def remove_many(self, kind, pks):
+        for pk in pks:
+            self.remove(kind, pk)
+
+    def rebuild(self):
+        pass
+
+    def search(self, query):
+        return SearchResults(self, query)
+
+    def count(self, query):
+        raise NotImplementedError
+
+    def fetch(self, query, offset, limit):
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Unindexed `icontains` search, used when no full-text engine is present.
+    """
+
+    def querysets(self, query):
+        from .models import Comment, Review, Title
+        return (
+            (TITLE, Title.objects.filter(name__icontains=query).values_list(
+                'id', 'id', 'name'
+            )),
+            (REVIEW, Review.objects.filter(text__icontains=query).values_list(
+                'id', 'title_id', 'text'
+            )),
+            (COMMENT, Comment.objects.filter(
+                text__icontains=query
+            ).values_list('id', 'review__title_id', 'text', 'review_id')),
+        )
+
+    def count(self, query):
+        return sum(queryset.count() for _, queryset in self.querysets(query))
+
+    def fetch(self, query, offset, limit):
+        hits = []
+        for kind, queryset in self.querysets(query):
+            if len(hits) >= limit:
+                break
+            total = queryset.count()
+            if offset >= total:
+                offset -= total
+                continue
+            for row in queryset.order_by('id')[offset:offset + limit
+                                               - len(hits)]:
+                hits.append({
+                    'type': kind,
+                    'id': row[0],
+                    'title_id': row[1],
+                    'review_id': row[3] if kind == COMMENT else None,
+                    'snippet': row[2][:200],
+                })
+            offset = 0
+        return hits
+
+
+class Fts5SearchBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 index ranked with bm25.
+
+    The rowid encodes the object: `pk * 4 + kind code`, so maintenance is a
+    rowid write and a hit can be decoded without extra columns.
+    """
+    table = 'reviews_search_index'
+    codes = {TITLE: 1, REVIEW: 2, COMMENT: 3}
+    kinds = {code: kind for kind, code in codes.items()}
+
+    @classmethod
+    def create_table_sql(cls):
+        return (
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {cls.table} USING fts5('
+            'body, title_id UNINDEXED, review_id UNINDEXED, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    @staticmethod
+    def match_expression(query):
+        return ' '.join(
+            '"{}"'.format(token.replace('"', '""')) for token in query.split()
+        )
+
+    def rowid(self, kind, pk):
+        return pk * 4 + self.codes[kind]
+
+    def row(self, kind, obj):
+        if kind == TITLE:
+            row = (f'{obj.name} {obj.description or ""}', obj.pk, None)
+        elif kind == REVIEW:
+            row = (obj.text, obj.title_id, None)
+        else:
+            row = (obj.text, obj.review.title_id, obj.review_id)
+        return (self.rowid(kind, obj.pk), *row)
+
+    def index(self, kind, obj):
+        self.index_many(kind, (obj,))
+
+    def index_many(self, kind, objs):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                '(rowid, body, title_id, review_id) VALUES (%s, %s, %s, %s)',
+                [self.row(kind, obj) for obj in objs]
+            )
+
+    def remove(self, kind, pk):
+        self.remove_many(kind, (pk,))
+
+    def remove_many(self, kind, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s',
+                               [(self.rowid(kind, pk),) for pk in pks])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, body, title_id, review_id) '
+                "SELECT id * 4 + 1, name || ' ' || COALESCE(description, ''), "
+                'id, NULL FROM reviews_title'
+            )
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, body, title_id, review_id) '
+                'SELECT id * 4 + 2, text, title_id, NULL FROM reviews_review'
+            )
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, body, title_id, review_id) '
+                'SELECT c.id * 4 + 3, c.text, r.title_id, c.review_id '
+                'FROM reviews_comment c '
+                'JOIN reviews_review r ON r.id = c.review_id'
+            )
+
+    def count(self, query):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {self.table} '
+                f'WHERE {self.table} MATCH %s',
+                (self.match_expression(query),)
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, query, offset, limit):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, title_id, review_id, '
+                f"snippet({self.table}, 0, '', '', '…', 24) "
+                f'FROM {self.table} WHERE {self.table} MATCH %s '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                (self.match_expression(query), limit, offset)
+            )
+            return [
+                {
+                    'type': self.kinds[rowid % 4],
+                    'id': rowid // 4,
+                    'title_id': title_id,
+                    'review_id': review_id,
+                    'snippet': snippet,
+                }
+                for rowid, title_id, review_id, snippet in cursor.fetchall()
+            ]
+
+
+@lru_cache(maxsize=None)
+def fts5_available(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def get_backend():
+    if fts5_available():
+        return Fts5SearchBackend()
+    return DatabaseSearchBackend()
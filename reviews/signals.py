@@ -0,0 +1,146 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from . import search, sqlite
+from .models import Comment, Review, Title, TitleStats
+
+# Sent with `instances` after rows are saved with `bulk_create`, which skips
+# `post_save`.
+post_bulk_create = Signal()
+# Sent with the deleted `(pk, parent id)` rows by
+# `ContentQuerySet.bulk_delete`, which skips `post_delete`.
+post_bulk_delete = Signal()
+# Sent after tables are rewritten in bulk without per-row signals, e.g. by
+# `import_csv` or the rebuild commands.
+post_bulk_load = Signal()
+# Sent with the `pks` of the authors whose `token_version` moved.
+post_token_revoke = Signal()
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite' and settings.SQLITE_TUNING:
+        sqlite.apply_pragmas(connection)
+
+
+@receiver(post_delete, sender=Review)
+def withdraw_review_rating(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).apply_rating_delta(
+        -int(instance.score), -1
+    )
+
+
+@receiver(post_bulk_delete, sender=Review)
+def rebuild_bulk_deleted_ratings(sender, rows, **kwargs):
+    title_ids = list({title_id for _, title_id in rows})
+    for start in range(0, len(title_ids), 5000):
+        Title.objects.filter(
+            pk__in=title_ids[start:start + 5000]
+        ).rebuild_ratings()
+
+
+@receiver(post_delete, sender=Review)
+def withdraw_review_stats(sender, instance, using, **kwargs):
+    TitleStats.objects.using(using).filter(
+        title_id=instance.title_id
+    ).apply_review_delta(int(instance.score), -1)
+
+
+@receiver(post_save, sender=Title)
+def create_title_stats(sender, instance, created, using, raw=False,
+                       **kwargs):
+    if not created:
+        return
+    if raw:
+        # Fixtures may carry the stats row as well
+        TitleStats.objects.using(using).get_or_create(title_id=instance.pk)
+    else:
+        TitleStats.objects.using(using).create(title=instance)
+
+
+@receiver(post_bulk_create, sender=Title)
+def create_titles_stats(sender, instances, **kwargs):
+    TitleStats.objects.bulk_create(
+        (TitleStats(title=title) for title in instances), batch_size=5000
+    )
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_stats(sender, instance, created, using, raw=False,
+                         **kwargs):
+    if created and not raw:
+        TitleStats.objects.using(using).filter(
+            title__reviews=instance.review_id
+        ).apply_comment_delta(1, instance.pub_date)
+
+
+@receiver(post_delete, sender=Comment)
+def withdraw_comment_stats(sender, instance, using, **kwargs):
+    # Runs before the review goes away when it cascades from one
+    TitleStats.objects.using(using).filter(
+        title__reviews=instance.review_id
+    ).apply_comment_delta(-1)
+
+
+@receiver(post_bulk_delete, sender=Review)
+def rebuild_bulk_deleted_review_stats(sender, rows, **kwargs):
+    Title.objects.filter(
+        pk__in={title_id for _, title_id in rows}
+    ).rebuild_stats()
+
+
+@receiver(post_bulk_delete, sender=Comment)
+def rebuild_bulk_deleted_comment_stats(sender, rows, **kwargs):
+    Title.objects.filter(
+        reviews__in={review_id for _, review_id in rows}
+    ).distinct().rebuild_stats()
+
+
+@receiver(post_save, sender=Title)
+def index_title(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.get_backend().index(search.TITLE, instance)
+
+
+@receiver(post_bulk_create, sender=Title)
+def index_titles(sender, instances, **kwargs):
+    search.get_backend().index_many(search.TITLE, instances)
+
+
+@receiver(post_save, sender=Review)
+def index_review(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.get_backend().index(search.REVIEW, instance)
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.get_backend().index(search.COMMENT, instance)
+
+
+@receiver(post_delete, sender=Title)
+def unindex_title(sender, instance, **kwargs):
+    search.get_backend().remove(search.TITLE, instance.pk)
+
+
+@receiver(post_delete, sender=Review)
+def unindex_review(sender, instance, **kwargs):
+    search.get_backend().remove(search.REVIEW, instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    search.get_backend().remove(search.COMMENT, instance.pk)
+
+
+@receiver(post_bulk_delete, sender=Review)
+def unindex_reviews(sender, rows, **kwargs):
+    search.get_backend().remove_many(search.REVIEW, [pk for pk, _ in rows])
+
+
+@receiver(post_bulk_delete, sender=Comment)
+def unindex_comments(sender, rows, **kwargs):
+    search.get_backend().remove_many(search.COMMENT, [pk for pk, _ in rows])
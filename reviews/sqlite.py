@@ -0,0 +1,30 @@
+"""
+Tuning of SQLite connections for production use.
+
+With `SQLITE_TUNING` enabled every new SQLite connection gets the pragmas of
+`SQLITE_PRAGMAS`: WAL journaling lets readers proceed while a review is
+being written, `synchronous=NORMAL` is durable enough under WAL and saves an
+fsync per commit, and the page cache, `mmap_size` and `busy_timeout` are
+sized for a server process instead of the library defaults. Run the
+`optimize_sqlite` command periodically to refresh planner statistics and
+truncate the WAL file.
+"""
+from django.conf import settings
+
+
+def apply_pragmas(connection):
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def optimize(connection):
+    """
+    Run `PRAGMA optimize` and checkpoint the WAL into the database file.
+
+    Returns the `(busy, log frames, checkpointed frames)` of the checkpoint.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA optimize')
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return cursor.fetchone()
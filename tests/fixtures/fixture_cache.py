@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    from api.cache import stats
+
+    cache.clear()
+    stats.reset()
+    yield
+    cache.clear()
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def email_queue(settings):
+    # Deliver in the request thread so `mail.outbox` is filled on return
+    settings.EMAIL_QUEUE_BACKEND = 'api.mail.ImmediateEmailQueue'
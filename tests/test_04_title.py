@@ -3,7 +3,7 @@ import json
 import pytest
 
 from .common import (auth_client, create_categories, create_genre,
-                     create_titles, create_users_api)
+                     create_reviews, create_titles, create_users_api)
 
 
 class Test04TitleAPI:
@@ -252,3 +252,194 @@ class Test04TitleAPI:
         user, moderator = create_users_api(admin_client)
         self.check_permissions(user, 'обычного пользователя', titles, categories, genres)
         self.check_permissions(moderator, 'модератора', titles, categories, genres)
+
+    @pytest.mark.parametrize('page_size', (5, 50, 500))
+    @pytest.mark.django_db(transaction=True)
+    def test_05_titles_query_count(self, client, admin_client, monkeypatch,
+                                   django_assert_num_queries, page_size):
+        from api.views import TitleViewSet
+        from reviews.models import Category, Genre, GenreTitle, Title
+
+        _, categories, genres = create_titles(admin_client)
+        category = Category.objects.get(slug=categories[0]['slug'])
+        genre_objects = list(Genre.objects.all())
+        titles = Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000, category=category)
+            for i in range(page_size)
+        )
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title in titles for genre in genre_objects
+        )
+        monkeypatch.setattr(TitleViewSet.pagination_class, 'page_size', page_size)
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/')
+        data = response.json()
+        assert len(data['results']) == page_size, (
+            'Проверьте, что при GET запросе `/api/v1/titles/` возвращаете данные с пагинацией.'
+        )
+        assert len(data['results'][-1]['genre']) == len(genres), (
+            'Проверьте, что при GET запросе `/api/v1/titles/` возвращаются жанры произведения'
+        )
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0].pk}/')
+        assert response.json()['category'] == categories[0], (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/` возвращается категория произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_titles_rating_filters(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Шедевр', 'score': 9})
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[1]['id'], titles[0]['id']], (
+            'Проверьте, что при GET запросе `/api/v1/titles/?ordering=-rating` '
+            'произведения отсортированы по убыванию рейтинга'
+        )
+        response = client.get('/api/v1/titles/?rating_min=5')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[1]['id']], (
+            'Проверьте, что при GET запросе `/api/v1/titles/` фильтруется по параметру `rating_min`'
+        )
+        response = client.get('/api/v1/titles/?rating_max=5')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[0]['id']], (
+            'Проверьте, что при GET запросе `/api/v1/titles/` фильтруется по параметру `rating_max`'
+        )
+        response = client.get('/api/v1/titles/?min_reviews=2')
+        ids = [title['id'] for title in response.json()['results']]
+        assert ids == [titles[0]['id']], (
+            'Проверьте, что при GET запросе `/api/v1/titles/` фильтруется по параметру `min_reviews`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_lookup_caches(self, client, admin_client, django_assert_num_queries):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        _, categories, genres = create_titles(admin_client)
+        for i in range(2):
+            admin_client.post('/api/v1/genres/', data={'name': f'Жанр {i}', 'slug': f'genre-{i}'})
+        slugs = [genre['slug'] for genre in genres] + ['genre-0', 'genre-1']
+        data = {'name': 'Пять жанров', 'year': 2001, 'genre': slugs, 'category': categories[0]['slug']}
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201 and set(response.json()['genre']) == set(slugs), (
+            'Проверьте, что при POST запросе `/api/v1/titles/` сохраняются все жанры произведения'
+        )
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_category"' in query['sql']
+            or 'FROM "reviews_genre" WHERE' in query['sql']
+        ]
+        assert not lookups, (
+            'Проверьте, что при POST запросе `/api/v1/titles/` жанры и категория берутся из кеша, '
+            'а не запрашиваются из базы'
+        )
+        response = admin_client.post('/api/v1/titles/', data={**data, 'genre': ['unknown']})
+        assert response.status_code == 400, (
+            'Проверьте, что при POST запросе `/api/v1/titles/` с несуществующим жанром возвращается статус 400'
+        )
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/genres/?search=жанр')
+        assert [genre['slug'] for genre in response.json()['results']] == ['genre-0', 'genre-1'], (
+            'Проверьте, что GET запрос `/api/v1/genres/` отдаётся из кеша и поддерживает поиск'
+        )
+        admin_client.delete('/api/v1/genres/genre-1/')
+        admin_client.post('/api/v1/categories/', data={'name': 'Игры', 'slug': 'games'})
+        assert client.get('/api/v1/genres/').json()['count'] == len(genres) + 1, (
+            'Проверьте, что удаление жанра сбрасывает кеш жанров'
+        )
+        assert client.get('/api/v1/categories/').json()['count'] == len(categories) + 1, (
+            'Проверьте, что создание категории сбрасывает кеш категорий'
+        )
+        title = client.get('/api/v1/titles/').json()['results'][-1]
+        assert {genre['slug'] for genre in title['genre']} == set(slugs[:-1]), (
+            'Проверьте, что удалённый жанр не возвращается в жанрах произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_08_stale_lookup_caches(self, admin_client, monkeypatch):
+        from api import lookups
+        from reviews.models import Genre
+
+        _, categories, genres = create_titles(admin_client)
+        stale = lookups.genres.snapshot()
+        monkeypatch.setattr(lookups.genres, 'snapshot', lambda: stale)
+        Genre.objects.create(name='Новый', slug='new')
+        data = {'name': 'Новый жанр', 'year': 2001, 'genre': ['new'], 'category': categories[0]['slug']}
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что жанр, которого еще нет в кеше, ищется в базе данных'
+        )
+
+        Genre.objects.filter(slug=genres[0]['slug']).delete()
+        data = {**data, 'genre': [genres[0]['slug'], 'new']}
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == 400 and genres[0]['slug'] in str(response.json()['genre']), (
+            'Проверьте, что жанр, удаленный после заполнения кеша, возвращает статус 400, а не 500'
+        )
+        response = admin_client.post('/api/v1/titles/bulk/', data=[
+            {**data, 'name': 'Устаревший 0', 'genre': ['new']}, {**data, 'name': 'Устаревший 1'},
+        ], format='json')
+        result = response.json()
+        assert response.status_code == 201 and [error['index'] for error in result['errors']] == [1], (
+            'Проверьте, что при массовом создании произведение с удаленным жанром возвращается в ошибках'
+        )
+        assert [item['index'] for item in result['created']] == [0]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_09_titles_bulk_create(self, client, admin_client, django_assert_max_num_queries):
+        from reviews.models import GenreTitle, Title
+
+        _, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/bulk/'
+        data = [
+            {'name': f'Пакет {i}', 'year': 1950 + i, 'genre': [genres[i % 3]['slug'], genres[2]['slug']],
+             'category': categories[i % 2]['slug']}
+            for i in range(50)
+        ]
+        data[3] = {**data[3], 'genre': ['unknown']}
+        data[7] = {**data[7], 'year': 3000}
+        assert client.post(url, data=data, content_type='application/json').status_code == 401, (
+            f'Проверьте, что POST запрос `{url}` без токена авторизации возвращает статус 401'
+        )
+        with django_assert_max_num_queries(10):
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{url}` с частично валидными данными возвращает статус 201'
+        )
+        result = response.json()
+        assert [error['index'] for error in result['errors']] == [3, 7], (
+            f'Проверьте, что POST запрос `{url}` возвращает ошибки по номерам невалидных элементов'
+        )
+        assert 'genre' in result['errors'][0]['errors'] and 'year' in result['errors'][1]['errors'], (
+            f'Проверьте, что POST запрос `{url}` возвращает ошибки полей невалидных элементов'
+        )
+        created = {item['index']: item['id'] for item in result['created']}
+        assert len(created) == 48 and Title.objects.filter(name__startswith='Пакет').count() == 48, (
+            f'Проверьте, что POST запрос `{url}` сохраняет все валидные произведения'
+        )
+        title = client.get(f'/api/v1/titles/{created[4]}/').json()
+        assert title['name'] == 'Пакет 4' and title['category'] == categories[0], (
+            f'Проверьте, что POST запрос `{url}` сохраняет поля произведений'
+        )
+        assert GenreTitle.objects.filter(title_id=created[2]).count() == 1, (
+            f'Проверьте, что POST запрос `{url}` не дублирует повторяющиеся жанры'
+        )
+        assert client.get('/api/v1/titles/autocomplete/', {'prefix': 'пакет 4'}).json()[0]['id'] == created[4], (
+            f'Проверьте, что произведения из POST запроса `{url}` попадают в индекс автодополнения'
+        )
+        assert client.get('/api/v1/search/', {'q': 'Пакет'}).json()['count'] == 48, (
+            f'Проверьте, что произведения из POST запроса `{url}` попадают в поисковый индекс'
+        )
+        response = admin_client.post(url, data=[data[3]], format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что POST запрос `{url}` без валидных элементов возвращает статус 400'
+        )
+        response = admin_client.post(url, data={'name': 'Одно'}, format='json')
+        assert response.status_code == 400, (
+            f'Проверьте, что POST запрос `{url}` принимает только список'
+        )
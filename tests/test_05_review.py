@@ -337,3 +337,89 @@ class Test05ReviewAPI:
             'без токена авторизации возвращается статус 401'
         )
         self.check_permissions(user, 'обычного пользователя', reviews, titles)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_review_rating_counters(self, admin_client, admin):
+        from django.core.management import call_command
+        from reviews.models import Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4.0), (
+            'Проверьте, что при создании отзыва обновляются счётчики рейтинга произведения'
+        )
+        admin_client.patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/', data={'score': 8}
+        )
+        auth_client(moderator).delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 2, 6.0), (
+            'Проверьте, что при изменении и удалении отзыва обновляются счётчики рейтинга произведения'
+        )
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 2, 6.0), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает счётчики рейтинга произведения'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).rating is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_reviews_cursor_pagination(self, client, admin_client, admin, monkeypatch):
+        from api.pagination import FeedCursorPagination, FeedPageNumberPagination
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(f'{url}?pagination=cursor&page_size=2')
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/?pagination=cursor` '
+            'возвращается статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data and data['next'] and data['previous'] is None, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/?pagination=cursor` '
+            'используется курсорная пагинация без параметра `count`'
+        )
+        ids = [review['id'] for review in data['results']]
+        data = client.get(data['next']).json()
+        ids += [review['id'] for review in data['results']]
+        assert ids == sorted((review['id'] for review in reviews), reverse=True), (
+            'Проверьте, что курсорная пагинация отзывов возвращает отзывы от новых к старым без пропусков'
+        )
+        data = client.get(f'{url}?pagination=cursor&page_size=1000').json()
+        assert len(data['results']) == len(reviews) and data['next'] is None, (
+            'Проверьте, что последняя страница курсорной пагинации не имеет `next`'
+        )
+        max_page_size = len(reviews) - 1
+        for pagination_class in (FeedCursorPagination, FeedPageNumberPagination):
+            monkeypatch.setattr(pagination_class, 'max_page_size', max_page_size)
+        for mode in ('cursor', 'page'):
+            data = client.get(url, {'pagination': mode, 'page_size': 500}).json()
+            assert len(data['results']) == max_page_size and data['next'], (
+                'Проверьте, что размер страницы ограничен `FEED_MAX_PAGE_SIZE`'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_reviews_query_count(self, client, admin_client, admin, django_assert_num_queries):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/` возвращается статус 200'
+        )
+        with django_assert_num_queries(2):
+            response = client.get(f'{url}{reviews[0]["id"]}/')
+        assert response.json()['author'] == admin.username, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/{review_id}/` '
+            'возвращается автор отзыва'
+        )
+        with django_assert_num_queries(8):
+            response = admin_client.post(
+                f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 5}
+            )
+        assert response.status_code == 201, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/reviews/` возвращается статус 201'
+        )
@@ -246,3 +246,27 @@ class Test06CommentAPI:
             'без токена авторизации возвращается статус 401'
         )
         self.check_permissions(user, 'обычного пользователя', f'{pre_url}{comments[2]["id"]}/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_comments_query_count(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            'Проверьте, что при GET запросе `/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'возвращается статус 200'
+        )
+        with django_assert_num_queries(2):
+            response = client.get(f'{url}{comments[0]["id"]}/')
+        assert response.json()['author'] == admin.username, (
+            'Проверьте, что при GET запросе '
+            '`/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/` '
+            'возвращается автор комментария'
+        )
+        with django_assert_num_queries(5):
+            response = admin_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == 201, (
+            'Проверьте, что при POST запросе `/api/v1/titles/{title_id}/reviews/{review_id}/comments/` '
+            'возвращается статус 201'
+        )
@@ -0,0 +1,102 @@
+import pytest
+from asgiref.sync import async_to_sync
+
+from .common import auth_client, create_comments
+
+
+class Test08ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_detail_cache(self, client, admin_client, admin, django_assert_num_queries):
+        from api.cache import stats
+
+        _, reviews, titles, user, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что первый GET запрос `/api/v1/titles/{title_id}/` не берётся из кеша'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(url)
+        assert response['X-Cache'] == 'HIT' and response.json()['rating'] == 4, (
+            'Проверьте, что повторный GET запрос `/api/v1/titles/{title_id}/` отдаётся из кеша'
+        )
+        auth_client(user).patch(f'{url}reviews/{reviews[1]["id"]}/', data={'score': 6})
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS' and response.json()['rating'] == 5, (
+            'Проверьте, что изменение отзыва сбрасывает кеш произведения'
+        )
+        admin_client.patch(url, data={'name': 'Новое название'})
+        response = client.get(url)
+        assert response.json()['name'] == 'Новое название', (
+            'Проверьте, что изменение произведения сбрасывает кеш произведения'
+        )
+        assert (stats.hits, stats.misses) == (1, 3), (
+            'Проверьте, что счётчики попаданий и промахов кеша считаются правильно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_feed_cache(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        for url in (reviews_url, comments_url):
+            client.get(url)
+            assert client.get(url)['X-Cache'] == 'HIT', (
+                f'Проверьте, что повторный GET запрос `{url}` отдаётся из кеша'
+            )
+        assert client.get(f'{comments_url}?page_size=1')['X-Cache'] == 'MISS', (
+            'Проверьте, что параметры запроса входят в ключ кеша'
+        )
+        admin_client.delete(f'{comments_url}{comments[0]["id"]}/')
+        response = client.get(comments_url)
+        assert response['X-Cache'] == 'MISS' and response.json()['count'] == len(comments) - 1, (
+            'Проверьте, что удаление комментария сбрасывает кеш списка комментариев'
+        )
+        assert client.get(reviews_url)['X-Cache'] == 'HIT', (
+            'Проверьте, что удаление комментария не сбрасывает кеш списка отзывов'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert client.get(reviews_url).status_code == 404, (
+            'Проверьте, что удаление произведения сбрасывает кеш списка отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_author_changes(self, client, admin_client, admin):
+        _, _, titles, user, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        client.get(url)
+        client.post('/api/v1/auth/signup/', data={'email': 'new@yamdb.fake', 'username': 'newcomer'})
+        auth_client(user).patch('/api/v1/users/me/', data={'bio': 'Новое описание'})
+        assert client.get(url)['X-Cache'] == 'HIT', (
+            'Проверьте, что регистрация и изменение профиля без смены имени не сбрасывают кеш отзывов'
+        )
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'username': 'renamed'})
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS' and 'renamed' in {
+            review['author'] for review in response.json()['results']
+        }, (
+            'Проверьте, что смена имени пользователя сбрасывает кеш отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_zero_padded_ids(self, client, async_client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        detail_url = f'/api/v1/titles/0{title_id}/'
+        comments_url = f'/api/v1/titles/0{title_id}/reviews/0{review_id}/comments/'
+        for url in (detail_url, comments_url):
+            client.get(url)
+            async_to_sync(async_client.get)(f'{url}?async=1')
+        admin_client.patch(f'/api/v1/titles/{title_id}/', data={'name': 'Ведущий ноль'})
+        admin_client.delete(f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comments[0]["id"]}/')
+        for response in (client.get(detail_url), async_to_sync(async_client.get)(f'{detail_url}?async=1')):
+            assert response['X-Cache'] == 'MISS' and response.json()['name'] == 'Ведущий ноль', (
+                'Проверьте, что изменение произведения сбрасывает кеш `/api/v1/titles/{title_id}/` '
+                'с ведущими нулями в идентификаторе'
+            )
+        for response in (client.get(comments_url), async_to_sync(async_client.get)(f'{comments_url}?async=1')):
+            assert response['X-Cache'] == 'MISS' and response.json()['count'] == len(comments) - 1, (
+                'Проверьте, что удаление комментария сбрасывает кеш списка комментариев '
+                'с ведущими нулями в идентификаторах'
+            )
@@ -0,0 +1,127 @@
+import time
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+
+from .common import create_comments
+
+
+class Test09ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_etag_not_modified(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+        urls = (
+            '/api/v1/titles/',
+            title_url,
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.has_header('ETag'), (
+                f'Проверьте, что при GET запросе `{url}` возвращается заголовок `ETag`'
+            )
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            assert response.status_code == 304 and not response.content, (
+                f'Проверьте, что при GET запросе `{url}` с актуальным `If-None-Match` '
+                'возвращается статус 304 без тела ответа'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_etag_changes(self, client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(title_url)['ETag']
+        admin_client.patch(f'{title_url}reviews/{reviews[0]["id"]}/', data={'score': 10})
+        response = client.get(title_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что после изменения отзыва `ETag` произведения меняется'
+        )
+        etag = client.get('/api/v1/categories/')['ETag']
+        admin_client.post('/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'})
+        response = client.get('/api/v1/categories/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после добавления категории `ETag` списка категорий меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_precondition_failed(self, client, admin_client):
+        from .common import create_titles
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url, HTTP_IF_MATCH='"stale"')
+        assert response.status_code == 412, (
+            'Проверьте, что GET запрос с неактуальным `If-Match` возвращает статус 412'
+        )
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_MATCH=etag).status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_bulk_commands_invalidate(self, client, admin_client, admin):
+        from reviews.models import Title
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        Title.objects.filter(pk=titles[0]['id']).update(rating=None, rating_sum=0, rating_count=0)
+        for command in ('rebuild_ratings', 'rebuild_title_stats'):
+            call_command(command, stdout=StringIO())
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200 and response['ETag'] != etag, (
+                f'Проверьте, что команда `{command}` меняет `ETag` закэшированных ответов'
+            )
+            etag = response['ETag']
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что после `rebuild_ratings` кэш ответов не возвращает устаревший рейтинг'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_zero_padded_ids(self, client, async_client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/0{title_id}/reviews/'
+        etag = client.get(url)['ETag']
+        admin_client.patch(f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/', data={'score': 10})
+        for get in (client.get, async_to_sync(async_client.get)):
+            response = get(url, headers={'If-None-Match': etag})
+            assert response.status_code == 200, (
+                'Проверьте, что после изменения отзыва `ETag` списка отзывов меняется '
+                'и при ведущих нулях в идентификаторе произведения'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_last_modified(self, client, async_client, admin_client, admin):
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert not client.get(url).has_header('Last-Modified'), (
+            'Проверьте, что `Last-Modified` не отправляется, пока последнее изменение моложе секунды'
+        )
+        time.sleep(1.1)
+        for get in (client.get, async_to_sync(async_client.get)):
+            last_modified = get(url).get('Last-Modified')
+            assert last_modified, (
+                f'Проверьте, что при GET запросе `{url}` возвращается заголовок `Last-Modified`'
+            )
+            response = get(url, headers={'If-Modified-Since': last_modified})
+            assert response.status_code == 304 and response['Last-Modified'] == last_modified, (
+                f'Проверьте, что GET запрос `{url}` с актуальным `If-Modified-Since` '
+                'возвращает статус 304'
+            )
+        admin_client.patch(f'{url}reviews/{reviews[0]["id"]}/', data={'score': 10})
+        time.sleep(1.1)
+        for get in (client.get, async_to_sync(async_client.get)):
+            response = get(url, headers={'If-Modified-Since': last_modified})
+            assert response.status_code == 200 and response['Last-Modified'] != last_modified, (
+                'Проверьте, что после изменения отзыва `Last-Modified` произведения меняется'
+            )
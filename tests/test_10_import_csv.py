@@ -0,0 +1,190 @@
+import csv
+import os
+import shutil
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .conftest import BASE_DIR
+
+
+class Test10ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_in_batches(self):
+        from django.contrib.auth.models import Group
+        from django.db.models.signals import post_delete
+
+        from reviews.models import Author, Comment, GenreTitle, Review, Title
+
+        call_command('import_csv', batch_size=7)
+        assert (Title.objects.count(), GenreTitle.objects.count(),
+                Review.objects.count(), Comment.objects.count()) == (32, 42, 72, 3), (
+            'Проверьте, что команда `import_csv` загружает все строки csv файлов пачками'
+        )
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count) == (20, 2), (
+            'Проверьте, что команда `import_csv` пересчитывает рейтинги произведений'
+        )
+        Author.objects.get(username='bingobongo').groups.add(Group.objects.create(name='Редакторы'))
+        deleted = []
+
+        def record_delete(sender, **kwargs):
+            deleted.append(sender)
+
+        post_delete.connect(record_delete)
+        try:
+            call_command('import_csv', batch_size=5)
+        finally:
+            post_delete.disconnect(record_delete)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный запуск `import_csv` заменяет ранее загруженные данные'
+        )
+        assert not deleted, (
+            'Проверьте, что `import_csv` удаляет старые данные без загрузки строк и сигналов `post_delete`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_upsert(self, tmp_path):
+        from reviews.models import Category, Genre, Review, Title
+
+        directory = tmp_path / 'data'
+        shutil.copytree(os.path.join(BASE_DIR, 'static/data'), directory)
+        Category.objects.create(name='Старая', slug='old')
+        call_command('import_csv', directory=directory, upsert=True, stdout=StringIO())
+        assert Title.objects.get(pk=1).category.slug == 'movie', (
+            'Проверьте, что `import_csv --upsert` связывает строки по естественным ключам, а не по id из csv'
+        )
+        assert Review.objects.get(pk=1).author.username == 'bingobongo'
+        review_ids = set(Review.objects.values_list('pk', flat=True))
+        with open(directory / 'category.csv', 'a', encoding='utf-8') as csv_file:
+            csv_file.write('\n4,Игры,games')
+        genres = (directory / 'genre.csv').read_text(encoding='utf-8')
+        (directory / 'genre.csv').write_text(genres.replace('Драма', 'Трагедия'), encoding='utf-8')
+
+        output = StringIO()
+        call_command('import_csv', directory=directory, upsert=True, stdout=output)
+        output = output.getvalue()
+        assert 'Category model: 4 rows' in output and 'inserted 1, updated 0, unchanged 3' in output, (
+            'Проверьте, что `import_csv --upsert` добавляет только новые строки'
+        )
+        assert 'inserted 0, updated 1, unchanged 14' in output, (
+            'Проверьте, что `import_csv --upsert` обновляет только изменённые строки'
+        )
+        assert 'inserted 0, updated 0, unchanged 72' in output, (
+            'Проверьте, что `import_csv --upsert` пропускает неизменённые строки'
+        )
+        assert Category.objects.filter(slug='games').exists(), (
+            'Проверьте, что `import_csv --upsert` сохраняет новые строки'
+        )
+        assert Genre.objects.get(slug='drama').name == 'Трагедия', (
+            'Проверьте, что `import_csv --upsert` сохраняет изменённые строки'
+        )
+        assert set(Review.objects.values_list('pk', flat=True)) == review_ids, (
+            'Проверьте, что `import_csv --upsert` не удаляет ранее загруженные отзывы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_upsert_unknown_foreign_keys(self, tmp_path):
+        from reviews.models import Title
+
+        directory = tmp_path / 'data'
+        shutil.copytree(os.path.join(BASE_DIR, 'static/data'), directory)
+        with open(directory / 'titles.csv', 'a', encoding='utf-8') as csv_file:
+            csv_file.write('\n999,Без категории,2000,99')
+        output, errors = StringIO(), StringIO()
+        call_command('import_csv', directory=directory, upsert=True, stdout=output, stderr=errors)
+        assert not Title.objects.filter(pk=999).exists() and 'category_id' in errors.getvalue(), (
+            'Проверьте, что `import_csv --upsert` пропускает строки со ссылками на отсутствующие в csv строки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_upsert_invalidates_caches(self, client, tmp_path):
+        directory = tmp_path / 'data'
+        shutil.copytree(os.path.join(BASE_DIR, 'static/data'), directory)
+        call_command('import_csv', directory=directory, upsert=True, stdout=StringIO())
+        url = '/api/v1/titles/1/'
+        name = client.get(url).json()['name']
+        assert client.get('/api/v1/titles/autocomplete/', {'prefix': name}).json()[0]['id'] == 1
+        titles = (directory / 'titles.csv').read_text(encoding='utf-8')
+        (directory / 'titles.csv').write_text(titles.replace(name, 'Обновленное название'), encoding='utf-8')
+
+        call_command('import_csv', directory=directory, upsert=True, stdout=StringIO())
+        assert client.get(url).json()['name'] == 'Обновленное название', (
+            'Проверьте, что после `import_csv --upsert` кеш ответов не возвращает устаревшие данные'
+        )
+        response = client.get('/api/v1/titles/autocomplete/', {'prefix': 'обновленное'})
+        assert [title['id'] for title in response.json()] == [1], (
+            'Проверьте, что после `import_csv --upsert` индекс автодополнения перестраивается'
+        )
+
+    def test_05_dependency_stages(self):
+        from reviews.management.commands.import_csv import Command, dependency_stages
+        from reviews.models import Author, Category, Comment, Genre, GenreTitle, Review, Title
+
+        stages = dependency_stages(list(Command.MODELS_DICT.values()))
+        assert stages == [[Category, Genre, Author], [Title], [GenreTitle, Review], [Comment]], (
+            'Проверьте, что модели загружаются по уровням зависимостей внешних ключей'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_parallel_import(self, tmp_path):
+        from reviews.models import Review
+
+        directory = tmp_path / 'data'
+        shutil.copytree(os.path.join(BASE_DIR, 'static/data'), directory)
+        reviews = (directory / 'review.csv').read_text(encoding='utf-8')
+        (directory / 'review.csv').write_text(reviews + '\n999,1,Текст,100,11,2020-01-13T23:20:02.422Z',
+                                              encoding='utf-8')
+        output, errors = StringIO(), StringIO()
+        call_command('import_csv', directory=directory, workers=2, batch_size=10,
+                     stdout=output, stderr=errors)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что `import_csv --workers` загружает все корректные строки'
+        )
+        assert 'skipped 1 invalid rows' in output.getvalue() and 'score' in errors.getvalue(), (
+            'Проверьте, что `import_csv` пропускает строки, не прошедшие валидацию'
+        )
+        assert 'Stage 4 (Comment)' in output.getvalue(), (
+            'Проверьте, что `import_csv` выводит время каждого уровня загрузки'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_07_upsert_refreshes_changed_rows(self, client, tmp_path):
+        from api.cache import GLOBAL_SCOPE, get_versions
+        from reviews.models import Title
+
+        directory = tmp_path / 'data'
+        shutil.copytree(os.path.join(BASE_DIR, 'static/data'), directory)
+        call_command('import_csv', directory=directory, upsert=True, stdout=StringIO())
+        version = get_versions((GLOBAL_SCOPE,))
+        output = StringIO()
+        call_command('import_csv', directory=directory, upsert=True, stdout=output)
+        assert get_versions((GLOBAL_SCOPE,)) == version and 'nothing to refresh' in output.getvalue(), (
+            'Проверьте, что `import_csv --upsert` без изменений не пересчитывает данные и не сбрасывает кеш'
+        )
+
+        with open(directory / 'review.csv', encoding='utf-8', newline='') as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        rows[0].update(text='Ксилофонная партия', score='4')
+        with open(directory / 'review.csv', 'w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=rows[0])
+            writer.writeheader()
+            writer.writerows(rows)
+        output = StringIO()
+        call_command('import_csv', directory=directory, upsert=True, stdout=output)
+        title = Title.objects.select_related('stats').get(pk=1)
+        assert (title.rating_sum, title.rating_count, title.stats.score_4, title.stats.score_10) == (14, 2, 1, 1), (
+            'Проверьте, что `import_csv --upsert` пересчитывает рейтинг и статистику изменённых произведений'
+        )
+        assert 'stats of 1 titles' in output.getvalue() and 'reindexed 1 rows' in output.getvalue(), (
+            'Проверьте, что `import_csv --upsert` пересчитывает только затронутые произведения и строки индекса'
+        )
+        hits = client.get('/api/v1/search/?q=ксилофонная').json()['results']
+        assert [(hit['type'], hit['id']) for hit in hits] == [('review', 1)], (
+            'Проверьте, что `import_csv --upsert` обновляет поисковый индекс изменённых строк'
+        )
+        assert get_versions((GLOBAL_SCOPE,)) != version, (
+            'Проверьте, что `import_csv --upsert` с изменениями сбрасывает кеш'
+        )
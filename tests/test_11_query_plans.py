@@ -0,0 +1,107 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments, create_titles
+
+WATCHED_TABLES = ('reviews_title', 'reviews_genretitle', 'reviews_review',
+                  'reviews_comment', 'reviews_author')
+FULL_SCAN = re.compile(r'\bSCAN (\w+)$')
+ORDER_BY = re.compile(r' ORDER BY (.+?)(?: LIMIT \d+)?(?: OFFSET \d+)?$')
+
+
+def is_selective(sql):
+    """
+    Whether a query filters rows or sorts them by more than the primary key.
+    """
+    if ' WHERE ' in sql:
+        return True
+    match = ORDER_BY.search(sql)
+    return bool(match) and any(
+        not column.split()[0].endswith('."id"')
+        for column in match.group(1).split(', ')
+    )
+
+
+def full_scans(sql):
+    """
+    Return the watched tables that a filtered or sorted query reads without
+    an index.
+    """
+    if not is_selective(sql):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        plan = [row[-1] for row in cursor.fetchall()]
+    return [match.group(1) for line in plan
+            if (match := FULL_SCAN.search(line))
+            and match.group(1) in WATCHED_TABLES]
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN syntax is SQLite specific')
+class Test11QueryPlans:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_hot_paths_use_indexes(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        comments_url = f'{title_url}reviews/{reviews[0]["id"]}/comments/'
+        urls = (
+            title_url,
+            '/api/v1/titles/?genre__slug__exact=horror',
+            '/api/v1/titles/?category__slug__exact=films',
+            '/api/v1/titles/?year__exact=2000',
+            '/api/v1/titles/?ordering=-rating',
+            '/api/v1/titles/?rating_min=4&min_reviews=1',
+            f'{title_url}reviews/',
+            f'{title_url}reviews/?pagination=cursor',
+            f'{title_url}reviews/{reviews[0]["id"]}/',
+            comments_url,
+            f'{comments_url}?pagination=cursor',
+            f'{comments_url}{comments[0]["id"]}/',
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+            )
+            for query in context.captured_queries:
+                tables = full_scans(query['sql'])
+                assert not tables, (
+                    f'Проверьте, что запрос при GET `{url}` использует индексы, '
+                    f'а не полный просмотр таблиц {tables}: {query["sql"]}'
+                )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_ordering_without_filters(self):
+        from reviews.models import Title
+
+        sql = str(Title.objects.order_by('-rating', 'id').query)
+        assert is_selective(sql) and not full_scans(sql), (
+            'Проверьте, что сортировка произведений по рейтингу использует индекс'
+        )
+        sql = str(Title.objects.order_by('name', 'id').query)
+        assert full_scans(sql) == ['reviews_title'], (
+            'Проверьте, что проверка планов замечает сортировку без индекса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_filters_keep_partial_matches(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        cases = (
+            ({'year': '20'}, 2, {'year__exact': '2000'}, 1),
+            ({'category__slug': categories[0]['slug'][:3]}, 1,
+             {'category__slug__exact': categories[0]['slug'][:3]}, 0),
+            ({'genre__slug': genres[0]['slug'].upper()}, 1,
+             {'genre__slug__exact': genres[0]['slug']}, 1),
+        )
+        for partial, partial_count, exact, exact_count in cases:
+            assert client.get('/api/v1/titles/', partial).json()['count'] == partial_count, (
+                f'Проверьте, что фильтр {partial} ищет по вхождению без учета регистра'
+            )
+            assert client.get('/api/v1/titles/', exact).json()['count'] == exact_count, (
+                f'Проверьте, что фильтр {exact} ищет по точному совпадению'
+            )
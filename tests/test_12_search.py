@@ -0,0 +1,70 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments
+
+
+class Test12Search:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search(self, client, admin_client, admin):
+        call_command('rebuild_search_index', stdout=StringIO())
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+
+        response = client.get('/api/v1/search/')
+        assert response.status_code == 400, (
+            'Проверьте, что GET запрос `/api/v1/search/` без параметра `q` возвращает статус 400'
+        )
+        response = client.get('/api/v1/search/?q=драма')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/search/` доступен без токена'
+        )
+        data = response.json()
+        assert data['count'] == 1 and data['results'][0]['type'] == 'title', (
+            'Проверьте, что поиск находит произведения по описанию'
+        )
+        assert data['results'][0]['id'] == titles[1]['id'], (
+            'Проверьте, что поиск возвращает `id` найденного объекта'
+        )
+        assert set(data['results'][0]) == {'type', 'id', 'title_id', 'review_id', 'snippet'}, (
+            'Проверьте, что результаты поиска содержат поля `type`, `id`, `title_id`, `review_id` и `snippet`'
+        )
+
+        hits = client.get('/api/v1/search/?q=qwerty321').json()['results']
+        assert {(hit['type'], hit['id']) for hit in hits} == {
+            ('review', reviews[2]['id']), ('comment', comments[2]['id'])
+        }, (
+            'Проверьте, что поиск находит отзывы и комментарии'
+        )
+        comment = next(hit for hit in hits if hit['type'] == 'comment')
+        assert (comment['title_id'], comment['review_id']) == (titles[0]['id'], reviews[0]['id']), (
+            'Проверьте, что результаты поиска по комментариям ссылаются на отзыв и произведение'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_maintenance(self, client, admin_client, admin):
+        call_command('rebuild_search_index', stdout=StringIO())
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        admin_client.patch(url, data={'description': 'Неожиданный финал'})
+        assert client.get('/api/v1/search/?q=финал').json()['count'] == 1, (
+            'Проверьте, что изменение произведения обновляет поисковый индекс'
+        )
+        assert client.get('/api/v1/search/?q=пике').json()['count'] == 0, (
+            'Проверьте, что изменение произведения убирает старый текст из поискового индекса'
+        )
+        admin_client.delete(f'{url}reviews/{reviews[2]["id"]}/')
+        assert client.get('/api/v1/search/?q=qwerty321').json()['count'] == 1, (
+            'Проверьте, что удаление отзыва убирает его из поискового индекса'
+        )
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/comments/{comments[2]["id"]}/')
+        assert client.get('/api/v1/search/?q=qwerty321').json()['count'] == 0, (
+            'Проверьте, что удаление комментария убирает его из поискового индекса'
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        assert client.get('/api/v1/search/?q=qwerty').json()['count'] == 2, (
+            'Проверьте, что команда `rebuild_search_index` заново строит поисковый индекс'
+        )
@@ -0,0 +1,52 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test13Autocomplete:
+    url = '/api/v1/titles/autocomplete/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_autocomplete(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        response = client.get(self.url)
+        assert response.status_code == 400, (
+            f'Проверьте, что GET запрос `{self.url}` без параметра `prefix` возвращает статус 400'
+        )
+        response = client.get(self.url, {'prefix': 'ПОВ'})
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{self.url}` доступен без токена'
+        )
+        assert response.json() == [{'id': titles[0]['id'], 'name': 'Поворот туда', 'year': 2000}], (
+            f'Проверьте, что `{self.url}` ищет названия по префиксу без учёта регистра '
+            'и возвращает поля `id`, `name` и `year`'
+        )
+        with django_assert_num_queries(0):
+            response = client.get(self.url, {'prefix': 'про'})
+        assert [title['id'] for title in response.json()] == [titles[1]['id']], (
+            f'Проверьте, что `{self.url}` отвечает из индекса в памяти без запросов к базе'
+        )
+        assert client.get(self.url, {'prefix': 'туда'}).json() == [], (
+            f'Проверьте, что `{self.url}` ищет только по началу названия'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_maintenance(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get(self.url, {'prefix': 'п'})
+
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Ёлка'})
+        assert [title['name'] for title in client.get(self.url, {'prefix': 'п'}).json()] == ['Поворот туда'], (
+            'Проверьте, что изменение названия произведения обновляет индекс автодополнения'
+        )
+        assert client.get(self.url, {'prefix': 'ел'}).json()[0]['name'] == 'Ёлка', (
+            'Проверьте, что индекс автодополнения не различает `е` и `ё`'
+        )
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Парк', 'year': 1990, 'genre': [titles[0]['genre'][0]], 'category': titles[0]['category']
+        })
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert [title['name'] for title in client.get(self.url, {'prefix': 'п', 'limit': 5}).json()] == ['Парк'], (
+            'Проверьте, что создание и удаление произведений обновляют индекс автодополнения'
+        )
@@ -0,0 +1,98 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_comments
+
+
+class Test14Moderation:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_bulk_delete(self, client, admin_client, admin):
+        from reviews.models import Comment, Title
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/bulk_delete/'
+        data = {'ids': [reviews[0]['id'], reviews[1]['id']]}
+        assert client.post(url, data=data, format='json').status_code == 401, (
+            f'Проверьте, что POST запрос `{url}` без токена авторизации возвращает статус 401'
+        )
+        assert auth_client(user).post(url, data=data, format='json').status_code == 403, (
+            f'Проверьте, что POST запрос `{url}` обычного пользователя возвращает статус 403'
+        )
+        assert auth_client(moderator).post(url, data={'ids': []}, format='json').status_code == 400, (
+            f'Проверьте, что POST запрос `{url}` с пустым списком `ids` возвращает статус 400'
+        )
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/bulk_delete/'
+        response = auth_client(moderator).post(other_url, data=data, format='json')
+        assert response.json() == {'deleted': 0}, (
+            'Проверьте, что массовое удаление затрагивает только отзывы выбранного произведения'
+        )
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+
+        response = auth_client(moderator).post(url, data=data, format='json')
+        assert response.status_code == 200 and response.json() == {'deleted': 2}, (
+            f'Проверьте, что POST запрос `{url}` модератора удаляет отзывы и возвращает их количество'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (4, 1, 4), (
+            'Проверьте, что массовое удаление отзывов пересчитывает рейтинг произведения'
+        )
+        assert not Comment.objects.filter(pk__in=[comment['id'] for comment in comments]).exists(), (
+            'Проверьте, что массовое удаление отзывов удаляет их комментарии'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+        assert [review['id'] for review in response.json()['results']] == [reviews[2]['id']], (
+            'Проверьте, что массовое удаление отзывов сбрасывает кеш ленты отзывов'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что массовое удаление отзывов сбрасывает кеш ленты комментариев'
+        )
+        assert client.get('/api/v1/search/?q=qwerty').json()['count'] == 0, (
+            'Проверьте, что массовое удаление убирает отзывы и комментарии из поискового индекса'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_bulk_delete(self, client, admin_client, admin):
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        client.get(url)
+        response = admin_client.post(
+            f'{url}bulk_delete/', data={'ids': [comments[0]['id'], comments[2]['id']]}, format='json'
+        )
+        assert response.json() == {'deleted': 2}, (
+            f'Проверьте, что POST запрос `{url}bulk_delete/` администратора удаляет комментарии'
+        )
+        assert [comment['id'] for comment in client.get(url).json()['results']] == [comments[1]['id']], (
+            'Проверьте, что массовое удаление комментариев сбрасывает кеш ленты комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_delete_author_content(self, client, admin_client, admin):
+        from reviews.models import Comment, Review, Title
+
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 10})
+        url = f'/api/v1/users/{admin.username}/delete_content/'
+        assert auth_client(user).post(url).status_code == 403, (
+            f'Проверьте, что POST запрос `{url}` обычного пользователя возвращает статус 403'
+        )
+        response = auth_client(moderator).post(url)
+        assert response.status_code == 200 and response.json() == {'reviews': 2, 'comments': 1}, (
+            f'Проверьте, что POST запрос `{url}` модератора удаляет отзывы и комментарии автора'
+        )
+        assert not Review.objects.filter(author=admin).exists() and not Comment.objects.filter(author=admin).exists(), (
+            f'Проверьте, что POST запрос `{url}` удаляет весь контент автора'
+        )
+        assert Comment.objects.count() == 0, (
+            'Проверьте, что удаление отзывов автора удаляет и комментарии к ним'
+        )
+        assert list(Title.objects.order_by('pk').values_list('rating_count', 'rating')) == [(2, 3.5), (0, None)], (
+            'Проверьте, что удаление контента автора пересчитывает рейтинги произведений'
+        )
+        assert auth_client(moderator).post('/api/v1/users/unknown/delete_content/').status_code == 404, (
+            'Проверьте, что удаление контента несуществующего автора возвращает статус 404'
+        )
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from .common import create_comments
+
+
+class Test15AsyncReads:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_async_reads_match_sync(self, client, async_client, admin_client, admin):
+        from api.async_views import AsyncReadView
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?year=2000&ordering=-rating',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/?page_size=1&page=2',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            '/api/v1/categories/',
+            '/api/v1/genres/?search=%D0%B4%D1%80%D0%B0%D0%BC%D0%B0',
+            '/api/v1/titles/999/',
+            '/api/v1/titles/?page=9',
+        )
+        for url in urls:
+            expected = client.get(url)
+            response = async_to_sync(async_client.get)(url)
+            assert issubclass(response.resolver_match.func.view_class, AsyncReadView), (
+                f'Проверьте, что под ASGI анонимный GET запрос `{url}` обрабатывается асинхронно'
+            )
+            assert (response.status_code, response.content) == (expected.status_code, expected.content), (
+                f'Проверьте, что асинхронный GET запрос `{url}` возвращает тот же ответ, что и синхронный'
+            )
+            assert response.get('ETag') == expected.get('ETag'), (
+                f'Проверьте, что асинхронный GET запрос `{url}` возвращает тот же ETag, что и синхронный'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_async_validators_and_fallback(self, async_client, admin_client, admin):
+        from api.async_views import AsyncReadView
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        get = async_to_sync(async_client.get)
+        response = get(url)
+        assert response['X-Cache'] == 'MISS' and get(url)['X-Cache'] == 'HIT', (
+            'Проверьте, что асинхронные обработчики используют кеш ответов'
+        )
+        assert get(url, headers={'If-None-Match': response['ETag']}).status_code == 304, (
+            'Проверьте, что асинхронные обработчики отвечают 304 на совпадающий If-None-Match'
+        )
+        response = get(f'{url}?pagination=cursor')
+        assert response.status_code == 200 and 'next' in response.json(), (
+            'Проверьте, что курсорная пагинация под ASGI обслуживается синхронным представлением'
+        )
+        response = get(url, headers={'Authorization': admin_client._credentials['HTTP_AUTHORIZATION']})
+        assert not issubclass(getattr(response.resolver_match.func, 'view_class', object), AsyncReadView), (
+            'Проверьте, что запросы с токеном обслуживаются синхронными представлениями'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_cache_is_not_read_on_event_loop(self, async_client, admin_client, admin, monkeypatch):
+        from django.core.cache import cache
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        on_loop = []
+
+        def record(method):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    pass
+                else:
+                    on_loop.append(method.__name__)
+                return method(*args, **kwargs)
+            return wrapper
+
+        for name in ('get', 'set', 'get_many', 'set_many'):
+            monkeypatch.setattr(cache, name, record(getattr(cache, name)))
+        get = async_to_sync(async_client.get)
+        assert get(url)['X-Cache'] == 'MISS' and get(url)['X-Cache'] == 'HIT'
+        assert not on_loop, (
+            f'Проверьте, что асинхронные обработчики не вызывают синхронный кеш в цикле событий: {on_loop}'
+        )
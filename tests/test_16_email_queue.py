@@ -0,0 +1,119 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP server is unavailable')
+
+
+class Test16EmailQueue:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_email_thread_pool(self, client, settings):
+        from api.mail import get_queue
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_BACKEND = 'api.mail.ThreadPoolEmailQueue'
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200, (
+            f'Проверьте, что POST запрос `{self.url_signup}` с валидными данными возвращает статус 200'
+        )
+        get_queue().join(timeout=10)
+        assert len(mail.outbox) == outbox_before_count + 1 and mail.outbox[-1].to == [data['email']], (
+            'Проверьте, что письмо с кодом подтверждения отправляется фоновой очередью'
+        )
+        email = OutgoingEmail.objects.get()
+        assert (email.status, email.attempts) == (OutgoingEmail.SENT, 1), (
+            'Проверьте, что отправленное письмо отмечается в таблице исходящих писем'
+        )
+        assert email.body == '' and mail.outbox[-1].body, (
+            'Проверьте, что текст отправленного письма с кодом подтверждения не хранится в таблице исходящих писем'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_outbox_batch_over_one_connection(self, settings):
+        from api.mail import get_queue
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_QUEUE_BACKEND = 'api.mail.OutboxEmailQueue'
+        settings.EMAIL_BACKEND = 'tests.test_16_email_queue.CountingBackend'
+        outbox_before_count = len(mail.outbox)
+        for i in range(5):
+            get_queue().enqueue(f'Письмо {i}', 'Текст', 'a@yamdb.fake', [f'user{i}@yamdb.fake'])
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что очередь `OutboxEmailQueue` только сохраняет письма в таблицу исходящих'
+        )
+        CountingBackend.opened = 0
+        call_command('send_queued_email', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 5, (
+            'Проверьте, что команда `send_queued_email` отправляет накопленные письма'
+        )
+        assert CountingBackend.opened == 1, (
+            'Проверьте, что накопленные письма отправляются через одно соединение'
+        )
+        assert not OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists(), (
+            'Проверьте, что команда `send_queued_email` отмечает письма отправленными'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_retry_with_backoff(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_BACKEND = 'tests.test_16_email_queue.FailingBackend'
+        settings.EMAIL_QUEUE_RETRY_DELAY = 10
+        settings.EMAIL_QUEUE_MAX_ATTEMPTS = 3
+        data = {'email': 'retry@yamdb.fake', 'username': 'retry'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200, (
+            'Проверьте, что ошибка почтового сервера не ломает регистрацию'
+        )
+        email = OutgoingEmail.objects.get()
+        delay = (email.next_attempt - timezone.now()).total_seconds()
+        assert email.status == OutgoingEmail.PENDING and email.attempts == 1 and 5 < delay <= 10, (
+            'Проверьте, что неотправленное письмо откладывается на `EMAIL_QUEUE_RETRY_DELAY` секунд'
+        )
+        assert 'SMTP server is unavailable' in email.last_error, (
+            'Проверьте, что для неотправленного письма сохраняется текст ошибки'
+        )
+
+        OutgoingEmail.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+        call_command('send_queued_email', stdout=StringIO())
+        email.refresh_from_db()
+        delay = (email.next_attempt - timezone.now()).total_seconds()
+        assert email.attempts == 2 and 15 < delay <= 20, (
+            'Проверьте, что задержка перед повторной отправкой растет экспоненциально'
+        )
+        OutgoingEmail.objects.update(next_attempt=timezone.now() - timedelta(seconds=1))
+        call_command('send_queued_email', stdout=StringIO())
+        email.refresh_from_db()
+        assert (email.status, email.attempts) == (OutgoingEmail.FAILED, 3), (
+            'Проверьте, что после `EMAIL_QUEUE_MAX_ATTEMPTS` попыток письмо больше не отправляется'
+        )
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        OutgoingEmail.objects.update(status=OutgoingEmail.PENDING,
+                                     next_attempt=timezone.now() - timedelta(seconds=1))
+        outbox_before_count = len(mail.outbox)
+        call_command('send_queued_email', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что отложенное письмо отправляется, когда почтовый сервер снова доступен'
+        )
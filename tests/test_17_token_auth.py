@@ -0,0 +1,145 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def author_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_author"' in query['sql']]
+
+
+class Test17TokenAuth:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_claims_skip_user_query(self, client, admin):
+        from django.contrib.auth import tokens
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        code = tokens.default_token_generator.make_token(admin)
+        response = client.post('/api/v1/auth/token/',
+                               data={'username': admin.username, 'confirmation_code': code})
+        assert response.status_code == 200, (
+            'Проверьте, что POST запрос `/api/v1/auth/token/` с верным кодом возвращает токен'
+        )
+        token = AccessToken(response.json()['token'])
+        assert (token['role'], token['is_staff'], token['is_superuser'], token['ver']) == ('admin', False, False, 0), (
+            'Проверьте, что токен содержит роль, права и версию токена пользователя'
+        )
+
+        admin_client = token_client(response.json()['token'])
+        admin_client.post('/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'})
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'})
+        assert response.status_code == 201 and not author_queries(context), (
+            'Проверьте, что проверка прав по токену не загружает пользователя из базы данных'
+        )
+        response = admin_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == admin.email and response.json()['bio'] == admin.bio, (
+            'Проверьте, что `/api/v1/users/me/` возвращает все поля пользователя при аутентификации по токену'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_role_change_revokes_tokens(self, admin, user):
+        from api.authentication import AuthorAccessToken
+
+        admin_client = token_client(AuthorAccessToken.for_user(admin))
+        stale_client = token_client(AuthorAccessToken.for_user(user))
+        assert stale_client.get('/api/v1/users/me/').status_code == 200
+        response = admin_client.patch(f'/api/v1/users/{user.username}/', data={'bio': 'Новое описание'})
+        assert response.status_code == 200 and stale_client.get('/api/v1/users/me/').status_code == 200, (
+            'Проверьте, что изменение полей без прав не отзывает токены пользователя'
+        )
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'moderator'})
+        assert stale_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что после смены роли старый токен пользователя отклоняется'
+        )
+        user.refresh_from_db()
+        response = token_client(AuthorAccessToken.for_user(user)).get('/api/v1/users/me/')
+        assert response.status_code == 200 and response.json()['role'] == 'moderator', (
+            'Проверьте, что новый токен пользователя после смены роли принимается'
+        )
+
+        stale_client = token_client(AuthorAccessToken.for_user(user))
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert stale_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен удаленного пользователя отклоняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_revocation_is_cached(self, admin, user, moderator):
+        from django.core.cache import cache
+
+        from api.authentication import TOKEN_VERSION_KEY, AuthorAccessToken
+
+        admin_client = token_client(AuthorAccessToken.for_user(admin))
+        stale_client = token_client(AuthorAccessToken.for_user(user))
+        assert stale_client.get('/api/v1/users/me/').status_code == 200
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'moderator'})
+        assert cache.get(TOKEN_VERSION_KEY.format(user.pk)) == 1, (
+            'Проверьте, что при отзыве токенов новая версия записывается в кэш, '
+            'чтобы ее получили все процессы'
+        )
+
+        deleted_client = token_client(AuthorAccessToken.for_user(moderator))
+        assert deleted_client.get('/api/v1/users/me/').status_code == 200
+        moderator.delete()
+        assert deleted_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен пользователя, удаленного не через API, отклоняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_changes_outside_api_revoke_tokens(self, admin, user, moderator, tmp_path):
+        import os
+        import shutil
+        from io import StringIO
+
+        from django.core.cache import cache
+        from django.core.management import call_command
+
+        from api.authentication import AuthorAccessToken
+        from reviews.models import Author
+        from .conftest import BASE_DIR
+
+        admin_client = token_client(AuthorAccessToken.for_user(admin))
+        assert admin_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        cache.clear()
+        assert admin_client.get('/api/v1/users/').status_code == 401, (
+            'Проверьте, что смена роли через `save()` отзывает токены пользователя'
+        )
+
+        user_client = token_client(AuthorAccessToken.for_user(user))
+        Author.objects.get(pk=user.pk).save(update_fields=('bio',))
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        moderator_client = token_client(AuthorAccessToken.for_user(moderator))
+        Author.objects.filter(pk=user.pk).update(is_staff=True)
+        staff = Author.objects.only('username').get(pk=user.pk)
+        staff.is_staff = False
+        staff.save(update_fields=('is_staff',))
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что изменение прав отзывает токены и при загрузке пользователя без этих полей'
+        )
+
+        directory = tmp_path / 'data'
+        shutil.copytree(os.path.join(BASE_DIR, 'static/data'), directory)
+        call_command('import_csv', directory=directory, upsert=True, stdout=StringIO())
+        imported = Author.objects.get(username='bingobongo')
+        imported_client = token_client(AuthorAccessToken.for_user(imported))
+        users = (directory / 'users.csv').read_text(encoding='utf-8')
+        (directory / 'users.csv').write_text(
+            users.replace('bingobongo@yamdb.fake,user', 'bingobongo@yamdb.fake,admin'), encoding='utf-8'
+        )
+        assert imported_client.get('/api/v1/users/me/').status_code == 200
+        call_command('import_csv', directory=directory, upsert=True, stdout=StringIO())
+        assert imported_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что смена роли через `import_csv --upsert` отзывает токены пользователя'
+        )
+        assert moderator_client.get('/api/v1/users/me/').status_code == 200
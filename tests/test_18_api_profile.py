@@ -0,0 +1,53 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def write_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+
+
+class Test18ApiProfile:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_token_without_session(self, client, admin):
+        from django.contrib.auth import tokens
+        from django.contrib.sessions.models import Session
+
+        code = tokens.default_token_generator.make_token(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.post('/api/v1/auth/token/',
+                                   data={'username': admin.username, 'confirmation_code': code})
+        assert response.status_code == 200 and 'token' in response.json(), (
+            'Проверьте, что POST запрос `/api/v1/auth/token/` с верным кодом возвращает токен'
+        )
+        writes = write_queries(context)
+        assert len(writes) == 1 and 'last_login' in writes[0] and not Session.objects.exists(), (
+            'Проверьте, что выдача токена не создает сессию и обновляет только `last_login`'
+        )
+        assert not response.cookies, (
+            'Проверьте, что выдача токена не устанавливает cookie сессии'
+        )
+        response = client.post('/api/v1/auth/token/',
+                               data={'username': admin.username, 'confirmation_code': code})
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения нельзя использовать повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_api_skips_site_middleware(self, client, admin_client):
+        response = admin_client.get('/api/v1/users/')
+        assert response.status_code == 200 and not response.cookies, (
+            'Проверьте, что запросы к API не устанавливают cookie'
+        )
+        assert 'Cookie' not in response.get('Vary', ''), (
+            'Проверьте, что ответы API не зависят от cookie'
+        )
+        assert client.post('/api/v1/auth/signup/', data={'username': 'csrf'}).status_code == 400, (
+            'Проверьте, что POST запросы к API не требуют CSRF токена'
+        )
+        response = client.get('/admin/login/')
+        assert response.status_code == 200 and 'csrftoken' in response.cookies, (
+            'Проверьте, что страницы сайта по-прежнему используют CSRF защиту'
+        )
@@ -0,0 +1,85 @@
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from .common import auth_client, create_titles
+
+
+@pytest.fixture
+def replica_db(transactional_db, tmp_path):
+    from api.db_routers import REPLICA
+
+    connections.settings[REPLICA] = connections.configure_settings({
+        'default': {},
+        REPLICA: {'ENGINE': 'django.db.backends.sqlite3',
+                  'NAME': str(tmp_path / 'replica.sqlite3')},
+    })[REPLICA]
+    call_command('migrate', database=REPLICA, verbosity=0)
+    yield REPLICA
+    connections[REPLICA].close()
+    del connections[REPLICA]
+    del connections.settings[REPLICA]
+
+
+class Test19DbRouter:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reads_use_replica(self, client, admin_client, user, replica_db, settings):
+        from reviews.models import Title
+
+        settings.DB_REPLICA_LAG_SECONDS = 0
+        titles, _, _ = create_titles(admin_client)
+        assert Title.objects.count() == len(titles), (
+            'Проверьте, что запись через API выполняется в основную базу данных'
+        )
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200 and response.json()['count'] == 0, (
+            'Проверьте, что анонимные GET запросы к API читают из реплики'
+        )
+        replica_title = Title.objects.using(replica_db).create(name='Реплика', year=2000)
+        response = client.get(f'/api/v1/titles/{replica_title.pk}/')
+        assert response.status_code == 200 and response.json()['name'] == 'Реплика', (
+            'Проверьте, что детальный GET запрос к API читает из реплики'
+        )
+        assert auth_client(user).get('/api/v1/titles/').json()['count'] == len(titles), (
+            'Проверьте, что GET запросы аутентифицированных пользователей читают из основной базы данных'
+        )
+        assert Title.objects.count() == len(titles), (
+            'Проверьте, что вне запросов к API чтение выполняется из основной базы данных'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_read_your_writes(self, admin_client, user, replica_db, settings):
+        settings.DB_REPLICA_LAG_SECONDS = 0
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client = auth_client(user)
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201, (
+            f'Проверьте, что POST запрос `{url}` создает отзыв в основной базе данных'
+        )
+        response = user_client.get(url)
+        assert response.status_code == 200 and response.json()['count'] == 1, (
+            'Проверьте, что пользователь читает свои изменения из основной базы данных'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_caches_are_filled_from_primary(self, client, admin_client, replica_db, settings):
+        settings.DB_REPLICA_LAG_SECONDS = 60
+        titles, categories, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        assert response.status_code == 200 and response.json()['name'] == titles[0]['name'], (
+            'Проверьте, что кешируемые ответы по недавно измененным данным строятся по основной базе данных'
+        )
+        response = client.get('/api/v1/titles/', {'category__slug__exact': categories[0]['slug']})
+        assert response.status_code == 200 and response.json()['count'] > 0
+
+        settings.DB_REPLICA_LAG_SECONDS = 0
+        response = client.get('/api/v1/titles/autocomplete/', {'prefix': titles[0]['name'][:3]})
+        assert [title['id'] for title in response.json()] == [titles[0]['id']], (
+            'Проверьте, что индекс автодополнения загружается из основной базы данных'
+        )
+        assert client.get(f'/api/v1/titles/{titles[1]["id"]}/').status_code == 404, (
+            'Проверьте, что по истечении `DB_REPLICA_LAG_SECONDS` анонимные запросы читают из реплики'
+        )
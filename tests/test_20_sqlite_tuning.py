@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+ALIAS = 'tuned'
+
+
+@pytest.fixture
+def sqlite_file(transactional_db, tmp_path):
+    connections.settings[ALIAS] = connections.configure_settings({
+        'default': {},
+        ALIAS: {'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': str(tmp_path / 'tuned.sqlite3')},
+    })[ALIAS]
+    # Not connected yet, so the test can still change the settings
+    yield connections[ALIAS]
+    connections[ALIAS].close()
+    del connections[ALIAS]
+    del connections.settings[ALIAS]
+
+
+def pragmas(connection, *names):
+    with connection.cursor() as cursor:
+        values = []
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            values.append(cursor.fetchone()[0])
+    return values
+
+
+class Test20SqliteTuning:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_pragmas_on_connect(self, sqlite_file, settings):
+        settings.SQLITE_TUNING = True
+        settings.SQLITE_PRAGMAS = {**settings.SQLITE_PRAGMAS, 'busy_timeout': 7000}
+        values = pragmas(sqlite_file, 'journal_mode', 'synchronous', 'cache_size',
+                         'mmap_size', 'busy_timeout')
+        assert values == ['wal', 1, settings.SQLITE_PRAGMAS['cache_size'],
+                          settings.SQLITE_PRAGMAS['mmap_size'], 7000], (
+            'Проверьте, что при `SQLITE_TUNING` к новому соединению применяются `SQLITE_PRAGMAS`'
+        )
+        output = StringIO()
+        call_command('optimize_sqlite', database=ALIAS, stdout=output)
+        assert 'WAL frames' in output.getvalue(), (
+            'Проверьте, что команда `optimize_sqlite` выполняет checkpoint журнала WAL'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_tuning_is_opt_in(self, sqlite_file, settings):
+        settings.SQLITE_TUNING = False
+        assert pragmas(sqlite_file, 'journal_mode', 'synchronous') == ['delete', 2], (
+            'Проверьте, что без `SQLITE_TUNING` настройки SQLite не меняются'
+        )
+        output = StringIO()
+        call_command('optimize_sqlite', database=ALIAS, stdout=output)
+        assert 'not in WAL mode' in output.getvalue()
@@ -0,0 +1,113 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from .common import create_comments
+
+
+def expected_histogram(**counts):
+    histogram = dict.fromkeys(map(str, range(1, 11)), 0)
+    histogram.update(counts)
+    return histogram
+
+
+class Test21TitleStats:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_stats_follow_reviews_and_comments(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert 'stats' not in client.get(url).json(), (
+            f'Проверьте, что GET запрос `{url}` без `expand=stats` не возвращает статистику'
+        )
+        stats = client.get(url, {'expand': 'stats'}).json()['stats']
+        assert stats['histogram'] == expected_histogram(**{'3': 1, '4': 1, '5': 1}), (
+            'Проверьте, что `stats.histogram` содержит число отзывов с каждой оценкой'
+        )
+        assert (stats['review_count'], stats['comment_count']) == (3, 3), (
+            'Проверьте, что `stats` содержит число отзывов и комментариев произведения'
+        )
+        assert stats['last_activity'] is not None
+
+        review_url = f'{url}reviews/{reviews[0]["id"]}/'
+        admin_client.patch(review_url, data={'score': 10})
+        admin_client.delete(f'{review_url}comments/{comments[0]["id"]}/')
+        stats = client.get(url, {'expand': 'stats'}).json()['stats']
+        assert stats['histogram'] == expected_histogram(**{'3': 1, '4': 1, '10': 1}), (
+            'Проверьте, что изменение оценки отзыва обновляет `stats.histogram`'
+        )
+        assert stats['comment_count'] == 2, (
+            'Проверьте, что удаление комментария обновляет `stats.comment_count`'
+        )
+
+        admin_client.delete(review_url)
+        stats = client.get(url, {'expand': 'stats'}).json()['stats']
+        assert (stats['review_count'], stats['comment_count']) == (2, 0), (
+            'Проверьте, что удаление отзыва вместе с комментариями обновляет `stats`'
+        )
+        assert client.get('/api/v1/titles/', {'expand': 'stats'}).json()['results'][1]['stats'] == {
+            'histogram': expected_histogram(), 'review_count': 0, 'comment_count': 0,
+            'last_activity': None,
+        }, (
+            'Проверьте, что у произведения без отзывов `stats` содержит нули'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_expand_stats_query_count(self, client, admin_client, admin, django_assert_num_queries):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        with django_assert_num_queries(3):
+            response = client.get('/api/v1/titles/', {'expand': 'stats'})
+        assert all('stats' in title for title in response.json()['results']), (
+            'Проверьте, что `expand=stats` добавляет статистику без отдельных запросов на каждое произведение'
+        )
+        response = client.get('/api/v1/titles/', {'expand': 'reviews'})
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное значение параметра `expand` возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_command(self, client, admin_client, admin):
+        from reviews.models import TitleStats
+
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        expected = list(TitleStats.objects.order_by('pk').values())
+        TitleStats.objects.all().delete()
+        output = StringIO()
+        call_command('rebuild_title_stats', stdout=output)
+        assert 'Successfully rebuilt 2 title stats' in output.getvalue()
+        assert list(TitleStats.objects.order_by('pk').values()) == expected, (
+            'Проверьте, что команда `rebuild_title_stats` восстанавливает статистику произведений'
+        )
+        stats = client.get(f'/api/v1/titles/{titles[0]["id"]}/', {'expand': 'stats'}).json()['stats']
+        assert stats['review_count'] == 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_score_change_and_fixtures(self, admin_client, admin, tmp_path):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from reviews.models import Review, TitleStats
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.score = 9
+        with CaptureQueriesContext(connection) as context:
+            review.save(update_fields=('score',))
+        updates = [query for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "reviews_titlestats"')]
+        stats = TitleStats.objects.get(title_id=titles[0]['id'])
+        assert len(updates) == 1 and (stats.score_5, stats.score_9, stats.review_count) == (0, 1, 3), (
+            'Проверьте, что изменение оценки переносит отзыв между столбцами гистограммы одним запросом'
+        )
+
+        fixture = tmp_path / 'titles.json'
+        fixture.write_text(json.dumps([{
+            'model': 'reviews.title', 'pk': 100, 'fields': {'name': 'Из фикстуры', 'year': 2001},
+        }]), encoding='utf-8')
+        call_command('loaddata', str(fixture), verbosity=0)
+        admin_client.post('/api/v1/titles/100/reviews/', data={'text': 'Отзыв', 'score': 8})
+        assert TitleStats.objects.get(title_id=100).review_count == 1, (
+            'Проверьте, что у произведений, загруженных из фикстур, ведется статистика'
+        )
@@ -0,0 +1,102 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+class Test22SparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_fields(self, client, admin_client, admin, django_assert_num_queries):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/', {'fields': 'id,name,rating'})
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/?fields=` возвращает статус 200'
+        )
+        assert [set(title) for title in response.json()['results']] == [{'id', 'name', 'rating'}] * 2, (
+            'Проверьте, что параметр `fields` оставляет в ответе только перечисленные поля'
+        )
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что без поля `genre` жанры произведений не запрашиваются'
+        )
+        assert 'description' not in context.captured_queries[-1]['sql'], (
+            'Проверьте, что параметр `fields` ограничивает выбираемые из базы данных столбцы'
+        )
+
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        with django_assert_num_queries(2):
+            data = client.get(url, {'fields': 'genre,category', 'expand': 'stats'}).json()
+        assert set(data) == {'genre', 'category', 'stats'}, (
+            'Проверьте, что раскрытые через `expand` поля добавляются к полям из `fields`'
+        )
+        assert sorted(genre['slug'] for genre in data['genre']) == sorted(titles[0]['genre']), (
+            'Проверьте, что поле `genre` возвращается полностью при выборе полей'
+        )
+        assert data == {key: value for key, value in client.get(url, {'expand': 'stats'}).json().items()
+                        if key in data}, (
+            'Проверьте, что выбранные поля совпадают с полным представлением'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_feed_fields(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        full = client.get(url).json()['results']
+        data = client.get(url, {'fields': 'id,author'}).json()['results']
+        assert data == [{'id': review['id'], 'author': review['author']} for review in full], (
+            'Проверьте, что параметр `fields` работает для отзывов'
+        )
+        response = client.get(url, {'fields': 'score', 'pagination': 'cursor', 'page_size': 2})
+        assert response.status_code == 200 and response.json()['next'], (
+            'Проверьте, что параметр `fields` совместим с курсорной пагинацией'
+        )
+        assert client.get(response.json()['next']).json()['results'] == [{'score': reviews[0]['score']}]
+
+        url = f'{url}{reviews[0]["id"]}/comments/'
+        data = client.get(url, {'fields': 'text'}).json()['results']
+        assert sorted(comment['text'] for comment in data) == sorted(comment['text'] for comment in comments), (
+            'Проверьте, что параметр `fields` работает для комментариев'
+        )
+        assert all(set(comment) == {'text'} for comment in data)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unknown_fields(self, client, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        cases = (
+            ('/api/v1/titles/', {'fields': 'name,rating_sum'}, 'fields'),
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/', {'fields': 'title'}, 'fields'),
+            (f'/api/v1/titles/{titles[0]["id"]}/reviews/', {'expand': 'stats'}, 'expand'),
+        )
+        for url, params, param in cases:
+            response = client.get(url, params)
+            assert response.status_code == 400 and param in response.json(), (
+                f'Проверьте, что неизвестное поле в параметре `{param}` запроса `{url}` '
+                'возвращает статус 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_fields_do_not_limit_writes(self, admin_client, admin, user):
+        from reviews.models import Review
+
+        from .common import auth_client
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = admin_client.patch(f'{url}{reviews[0]["id"]}/?fields=id', data={'score': 9})
+        assert response.status_code == 200 and response.json() == {'id': reviews[0]['id']}, (
+            'Проверьте, что параметр `fields` ограничивает ответ на PATCH запрос'
+        )
+        assert Review.objects.get(pk=reviews[0]['id']).score == 9, (
+            'Проверьте, что параметр `fields` не ограничивает сохраняемые поля'
+        )
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/?fields=score'
+        response = auth_client(user).post(url, data={'text': 'Отзыв', 'score': 6})
+        assert response.status_code == 201 and response.json() == {'score': 6}, (
+            'Проверьте, что POST запрос с параметром `fields` создает отзыв'
+        )
+        response = auth_client(user).post(url, data={'text': 'Отзыв'})
+        assert response.status_code == 400 and 'score' in response.json(), (
+            'Проверьте, что параметр `fields` не отключает проверку обязательных полей'
+        )
@@ -0,0 +1,69 @@
+import datetime as dt
+import json
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from .common import create_comments
+
+
+class Test23FastRendering:
+
+    def test_01_renderer_matches_drf(self):
+        from api.renderers import FastJSONRenderer
+
+        payloads = (
+            {'count': 2, 'next': None, 'results': [{'id': 1, 'rating': 4.333333333333333}]},
+            {'name': 'Поворот туда', 'line': 'a\u2028b\u2029c', 'quote': '"\\</script>'},
+            {'date': dt.datetime(2020, 1, 2, 3, 4, 5, 678901, tzinfo=dt.timezone.utc),
+             'day': dt.date(2020, 1, 2), 'decimal': Decimal('1.50'), 'lazy': gettext_lazy('name')},
+            {1: 'non-string key', 'set': {3}},
+            [None, True, False, 0, -0.0, 2 ** 70, []],
+        )
+        for data in payloads:
+            assert FastJSONRenderer().render(data) == JSONRenderer().render(data), (
+                'Проверьте, что `FastJSONRenderer` возвращает те же байты, что и `JSONRenderer`'
+            )
+        assert FastJSONRenderer().render(None) == b''
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_lists_render_rows(self, client, admin_client, admin):
+        from api.serializers import CommentSerializer, ReviewSerializer, TitleSerializer
+        from api.views import TitleViewSet
+        from reviews.models import Comment, Review, Title
+
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        Title.objects.filter(pk=titles[1]['id']).update(category=None, description=None)
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        cases = (
+            ('/api/v1/titles/', TitleSerializer, TitleViewSet.queryset.all(),
+             '"reviews_title"."rating_sum"'),
+            (review_url, ReviewSerializer, Review.objects.filter(title_id=titles[0]['id']),
+             '"reviews_author"."password"'),
+            (f'{review_url}{reviews[0]["id"]}/comments/', CommentSerializer,
+             Comment.objects.filter(review_id=reviews[0]['id']), '"reviews_author"."password"'),
+        )
+        for url, serializer_class, queryset, unused_column in cases:
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            expected = serializer_class(queryset, many=True).data
+            assert response.json()['results'] == json.loads(JSONRenderer().render(expected)), (
+                f'Проверьте, что GET запрос `{url}` возвращает те же данные, что и сериализатор'
+            )
+            assert response.content == JSONRenderer().render(response.json()), (
+                f'Проверьте, что ответ на GET запрос `{url}` совпадает с выводом `JSONRenderer`'
+            )
+            assert not any(unused_column in query['sql'] for query in context.captured_queries), (
+                f'Проверьте, что GET запрос `{url}` выбирает только столбцы, нужные для ответа'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_browsable_api_uses_instances(self, admin_client):
+        response = admin_client.get('/api/v1/titles/', HTTP_ACCEPT='text/html')
+        assert response.status_code == 200 and b'<html' in response.content, (
+            'Проверьте, что HTML представление списка произведений по-прежнему доступно'
+        )